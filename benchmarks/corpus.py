@@ -0,0 +1,54 @@
+import random
+from typing import List
+
+TOPICS = [
+    "recursion", "hash tables", "binary search", "dynamic programming", "graphs",
+    "sorting", "linked lists", "concurrency", "generators", "decorators",
+    "closures", "exceptions", "iterators", "heaps", "tries", "caching",
+]
+
+WORDS = [
+    "function", "value", "list", "index", "memory", "loop", "call", "stack",
+    "node", "key", "time", "complexity", "return", "object", "class", "state",
+    "input", "output", "case", "pointer", "thread", "lock", "queue", "result",
+]
+
+
+def synthetic_markdown(sections: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(sections):
+        topic = TOPICS[i % len(TOPICS)]
+        parts.append(f"## {topic.title()} {i}")
+        for _ in range(3):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 30)))
+            parts.append(f"- {topic.capitalize()} {sentence}.")
+        parts.append(f"```python\ndef {topic.replace(' ', '_')}_{i}(x):\n    return x\n```")
+    return "\n\n".join(parts)
+
+
+def synthetic_queries(count: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        f"How does {rng.choice(TOPICS)} use the {rng.choice(WORDS)} and {rng.choice(WORDS)}?"
+        for _ in range(count)
+    ]
+
+
+def synthetic_captions(segments: int, seed: int = 2) -> List[dict]:
+    """Auto-caption style segments: rolling lines that repeat the previous
+    line's tail, non-speech markers, fillers and no punctuation."""
+    rng = random.Random(seed)
+    captions = []
+    previous: List[str] = []
+    t = 0.0
+    for i in range(segments):
+        if i % 25 == 0:
+            captions.append({"text": rng.choice(["[Music]", "[Applause]", "[Laughter]"]), "start": t, "duration": 1.5})
+            t += 1.5
+        words = [rng.choice(WORDS + ["um", "uh"]) for _ in range(rng.randint(3, 8))]
+        carried = previous[-rng.randint(2, 4):] if previous and rng.random() < 0.7 else []
+        captions.append({"text": " ".join(carried + words), "start": t, "duration": 2.0})
+        previous = words
+        t += rng.uniform(1.0, 2.5)
+    return captions
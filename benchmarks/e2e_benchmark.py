@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# NotionSettings refuses to start without a token; the fake Notion API ignores it.
+os.environ.setdefault("NOTION_API_KEY", "benchmark")
+
+from benchmarks.fakes import FakeNotionServer, FakeTranscriptService, MockOpenRouterServer
+from integrations.notion_sync import NotionPageSync
+from integrations.rag_implementation import MarkdownVectorStore
+from services.ai_notes_service import AINotesService
+from services.batch_pipeline import VideoJob, build_video_pipeline
+from services.langchain_notes_service import LangChainNotesService
+from services.openrouter_client import OpenRouterClient
+from services.token_packer import TokenCounter, TranscriptPacker
+from utils.tracing import tracer
+
+
+class BenchmarkNotionSync(NotionPageSync):
+    """NotionPageSync with its NotionClient pointed at the fake Notion API.
+
+    Requests go through the same NotionClient and AsyncHttpClient (rate
+    limiter, retries) as in production, but not through the MCP server's
+    HTTP endpoints, which do not expose the block-level tools the sync uses.
+    """
+
+    def __init__(self, api_url: str, state_dir: str):
+        super().__init__(parent_page_id="benchmark-parent", state_dir=state_dir)
+        self.api_url = api_url
+
+    def _default_client(self):
+        from integrations.notion_mcp_server import AsyncHttpClient, NotionClient, NotionSettings
+
+        return NotionClient(AsyncHttpClient(base_url=self.api_url, headers=NotionSettings().headers))
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline end-to-end pipeline benchmark (run: python -m benchmarks.e2e_benchmark)"
+    )
+    parser.add_argument("--videos", type=int, default=20)
+    parser.add_argument("--segments", type=int, default=1500, help="caption segments per video")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds before each completion")
+    parser.add_argument("--llm-token-delay", type=float, default=0.0, help="seconds per generated token")
+    parser.add_argument("--rate-limit-every", type=int, default=10, help="reject every Nth LLM call with 429 (0 = never)")
+    parser.add_argument("--notion-latency", type=float, default=0.05)
+    parser.add_argument("--context-tokens", type=int, default=8000)
+    parser.add_argument("--tokenizer", default="", help="Hugging Face tokenizer repo (default: offline estimate)")
+    parser.add_argument("--output", default=None, help="JSON results file (default: benchmarks/results/e2e-<commit>-<time>.json)")
+    args = parser.parse_args()
+
+    llm = MockOpenRouterServer(args.llm_latency, args.llm_token_delay, args.rate_limit_every).start()
+    notion = FakeNotionServer(args.notion_latency).start()
+    client = OpenRouterClient(api_key="benchmark", url=llm.chat_url, backoff_base=0.05)
+    notes_service = LangChainNotesService(
+        ai_service=AINotesService(use_cache=False, client=client),
+        packer=TranscriptPacker(TokenCounter(args.tokenizer or None), context_tokens=args.context_tokens),
+    )
+
+    start = time.perf_counter()
+    vector_store = MarkdownVectorStore(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name="bench_e2e",
+        use_embedding_cache=False,
+    )
+    warm_up = time.perf_counter() - start
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = build_video_pipeline(
+                transcript_service=FakeTranscriptService(args.segments),
+                notes_service=notes_service,
+                notion_client=BenchmarkNotionSync(notion.api_url, os.path.join(tmp, "notion")),
+                vector_store=vector_store,
+                output_dir=os.path.join(tmp, "output"),
+            )
+            with tracer.span("batch", videos=args.videos):
+                jobs = pipeline.run(VideoJob(f"bench{i:04d}") for i in range(args.videos))
+    finally:
+        llm.stop()
+        notion.stop()
+
+    summary = pipeline.summary(jobs)
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "warm_up_seconds": warm_up,
+        "wall_time": summary["wall_time"],
+        "videos": summary["videos"],
+        "succeeded": summary["succeeded"],
+        "videos_per_hour": summary["videos_per_hour"],
+        "stages": summary["stages"],
+        "peak_rss_mb": peak_rss_mb(),
+        "llm": {**client.stats(), "server_requests": llm.requests, "server_rate_limited": llm.rate_limited},
+        "notion_requests": notion.requests,
+        "trace": tracer.export(),
+        "errors": {job.video_id: f"{job.failed_stage}: {job.error}" for job in jobs if not job.ok},
+    }
+
+    print(pipeline.format_summary(jobs))
+    for name, stage in summary["stages"].items():
+        print(f"  {name:<10} p50={stage['p50']:.2f}s  p95={stage['p95']:.2f}s")
+    print(client.format_stats())
+    print(f"Notion requests: {notion.requests}, peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"e2e-{results['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.corpus import synthetic_markdown, synthetic_queries
+from config.settings import EMBEDDING_BATCH_SIZE, EMBEDDING_THREADS
+from integrations.embedding_backends import OnnxEmbeddingBackend, SentenceTransformerBackend
+
+MODEL = "BAAI/bge-small-en-v1.5"
+
+
+def chunk_corpus(sections: int) -> list[str]:
+    # Same splitter settings as MarkdownVectorStore._chunk_text.
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=800, chunk_overlap=150, separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    return [chunk for chunk in splitter.split_text(synthetic_markdown(sections)) if len(chunk.strip()) > 20]
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(queries @ corpus.T), axis=1)[:, :k]
+
+
+def overlap(reference: np.ndarray, candidate: np.ndarray) -> float:
+    k = reference.shape[1]
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(reference, candidate)]))
+
+
+def measure(backend, chunks: list[str], queries: list[str], k: int) -> dict:
+    backend.encode(chunks[:8])  # warm-up
+    start = time.perf_counter()
+    corpus_vectors = backend.encode(chunks)
+    encode_seconds = time.perf_counter() - start
+
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(backend.encode([query])[0])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "chunks_per_sec": len(chunks) / encode_seconds,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "top_k": top_k(corpus_vectors, np.asarray(query_vectors), k),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="PyTorch vs. ONNX Runtime embedding backends on a fixed corpus "
+        "(run: python -m benchmarks.embedding_benchmark)"
+    )
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--threads", type=int, default=EMBEDDING_THREADS, help="0 = runtime default")
+    args = parser.parse_args()
+
+    chunks = chunk_corpus(args.sections)
+    queries = synthetic_queries(args.queries)
+    print(f"{len(chunks)} chunks, {len(queries)} queries, batch size {args.batch_size}\n")
+
+    configs = [
+        ("torch", lambda: SentenceTransformerBackend(MODEL, args.batch_size, args.threads)),
+        ("onnx (unsorted)", lambda: OnnxEmbeddingBackend(MODEL, args.batch_size, args.threads, length_buckets=False)),
+        ("onnx", lambda: OnnxEmbeddingBackend(MODEL, args.batch_size, args.threads)),
+        ("onnx-int8", lambda: OnnxEmbeddingBackend(MODEL, args.batch_size, args.threads, quantize=True)),
+    ]
+
+    print(f"{'backend':<16} {'load s':>7} {'chunks/s':>9} {'q p50 ms':>9} {'q p95 ms':>9} {f'top-{args.top_k} overlap':>14}")
+    reference = None
+    for label, build in configs:
+        start = time.perf_counter()
+        try:
+            backend = build()
+        except Exception as e:
+            print(f"{label:<16} skipped: {e}")
+            continue
+        load = time.perf_counter() - start
+        result = measure(backend, chunks, queries, args.top_k)
+        if reference is None:
+            reference = result["top_k"]
+        print(
+            f"{label:<16} {load:>7.1f} {result['chunks_per_sec']:>9.1f} {result['query_p50_ms']:>9.2f} "
+            f"{result['query_p95_ms']:>9.2f} {overlap(reference, result['top_k']):>14.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Local stand-ins for YouTube, OpenRouter and Notion used by the offline benchmarks."""
+
+import json
+import re
+import threading
+import time
+import uuid
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from benchmarks.corpus import synthetic_captions
+from services.transcript_service import TranscriptService
+
+
+class FakeTranscriptService(TranscriptService):
+    """Serves synthetic auto-caption segments instead of calling YouTube."""
+
+    def __init__(self, segments_per_video: int = 1500, compact: bool = True):
+        super().__init__(use_cache=False, compact=compact)
+        self.segments_per_video = segments_per_video
+
+    def get_segments(self, video_id: str) -> List[Dict]:
+        return synthetic_captions(self.segments_per_video, seed=zlib.crc32(video_id.encode()))
+
+
+class _LocalServer:
+    def __init__(self, handler_class):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+        self.server.daemon_threads = True
+        self.server.owner = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _send_json(self, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _OpenRouterHandler(_JSONHandler):
+    def do_POST(self):
+        fake: MockOpenRouterServer = self.server.owner
+        payload = self._body()
+        if fake.should_rate_limit():
+            self._send_json(429, {"error": {"message": "Rate limit exceeded"}}, {"Retry-After": "0"})
+            return
+
+        prompt = payload["messages"][-1]["content"]
+        notes = fake.notes_for(prompt)
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(notes) // 4,
+            "total_tokens": (len(prompt) + len(notes)) // 4,
+        }
+        time.sleep(fake.latency)
+
+        if not payload.get("stream"):
+            fake.sleep_tokens(notes)
+            self._send_json(
+                200,
+                {"choices": [{"message": {"role": "assistant", "content": notes}}], "usage": usage},
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in re.findall(r"\S+\s*", notes):
+            time.sleep(fake.token_delay)
+            self._write_chunk({"choices": [{"delta": {"content": token}}]})
+        self._write_chunk({"choices": [{"delta": {}}], "usage": usage})
+        self._write_raw(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, event: Dict) -> None:
+        self._write_raw(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+    def _write_raw(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+
+class MockOpenRouterServer(_LocalServer):
+    """Chat completions endpoint that answers with deterministic Markdown notes.
+
+    `latency` is added before every answer and `token_delay` per generated
+    token; every `rate_limit_every`-th request is rejected with a 429.
+    """
+
+    def __init__(self, latency: float = 0.2, token_delay: float = 0.0, rate_limit_every: int = 0):
+        super().__init__(_OpenRouterHandler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.rate_limit_every = rate_limit_every
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    @property
+    def chat_url(self) -> str:
+        return f"{self.url}/api/v1/chat/completions"
+
+    def should_rate_limit(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            limited = bool(self.rate_limit_every) and self.requests % self.rate_limit_every == 0
+            self.rate_limited += int(limited)
+            return limited
+
+    def sleep_tokens(self, notes: str) -> None:
+        if self.token_delay:
+            time.sleep(self.token_delay * len(notes.split()))
+
+    @staticmethod
+    def notes_for(prompt: str) -> str:
+        transcript = prompt.split("Transcript:\n", 1)[-1]
+        words = transcript.split()
+        sections = []
+        for i in range(0, len(words), 120):
+            window = words[i : i + 120]
+            bullets = "\n".join(
+                f"- {' '.join(window[j : j + 15]).capitalize()}."
+                for j in range(0, len(window), 30)
+            )
+            sections.append(f"## Section {i // 120 + 1}\n\n{bullets}")
+        sections.append("```python\ndef example(x):\n    return x\n```")
+        return "\n\n".join(sections)
+
+
+class _NotionHandler(_JSONHandler):
+    _PATH = re.compile(r"^/v1/(pages|blocks)(?:/([^/?]+))?(/children)?(?:\?.*)?$")
+
+    def _route(self, method: str) -> None:
+        fake: FakeNotionServer = self.server.owner
+        time.sleep(fake.latency)
+        match = self._PATH.match(self.path)
+        if not match:
+            self._send_json(404, {"object": "error", "message": f"No route {self.path}"})
+            return
+        status, payload = fake.handle(method, match.group(1), match.group(2), bool(match.group(3)), self._body())
+        self._send_json(status, payload)
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+class FakeNotionServer(_LocalServer):
+    """Keeps pages and their top-level blocks in memory, speaking the subset
+    of the Notion REST API that NotionClient uses."""
+
+    def __init__(self, latency: float = 0.05):
+        super().__init__(_NotionHandler)
+        self.latency = latency
+        self.pages: Dict[str, List[Dict]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/v1"
+
+    @staticmethod
+    def _new_blocks(children: List[Dict]) -> List[Dict]:
+        return [{**child, "id": str(uuid.uuid4()), "archived": False} for child in children]
+
+    def _find_block(self, block_id: str):
+        for blocks in self.pages.values():
+            for index, block in enumerate(blocks):
+                if block["id"] == block_id:
+                    return blocks, index
+        return None, None
+
+    def handle(self, method: str, kind: str, object_id: Optional[str], children: bool, body: Dict):
+        with self._lock:
+            self.requests += 1
+            if kind == "pages" and method == "POST":
+                page_id = str(uuid.uuid4())
+                self.pages[page_id] = self._new_blocks(body.get("children", []))
+                return 200, {"object": "page", "id": page_id, "url": f"https://notion.local/{page_id}"}
+            if kind == "pages" and object_id in self.pages:
+                return 200, {"object": "page", "id": object_id, "archived": body.get("archived", False)}
+
+            if kind == "blocks" and children and object_id in self.pages:
+                blocks = self.pages[object_id]
+                if method == "GET":
+                    return 200, {"object": "list", "results": blocks, "has_more": False, "next_cursor": None}
+                if method == "PATCH":
+                    position = len(blocks)
+                    if body.get("after"):
+                        position = [block["id"] for block in blocks].index(body["after"]) + 1
+                    created = self._new_blocks(body["children"])
+                    blocks[position:position] = created
+                    return 200, {"object": "list", "results": created, "has_more": False}
+
+            if kind == "blocks" and not children:
+                blocks, index = self._find_block(object_id)
+                if blocks is not None:
+                    if method == "DELETE":
+                        return 200, {**blocks.pop(index), "archived": True}
+                    if method == "PATCH":
+                        blocks[index].update(body)
+                        return 200, blocks[index]
+            return 404, {"object": "error", "message": f"{method} {kind}/{object_id} not found"}
@@ -0,0 +1,109 @@
+import argparse
+import time
+import uuid
+
+import numpy as np
+
+from config.settings import QDRANT_API_KEY, QDRANT_URL
+from integrations.vector_index import QDRANT_PROFILES, QdrantIndex
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def clustered_vectors(rng, count: int, dim: int, clusters: int = 200) -> np.ndarray:
+    # Note embeddings cluster by topic, so the synthetic vectors do too.
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.35 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def wait_until_indexed(index: QdrantIndex, timeout: float = 600) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        info = index.client.get_collection(index.collection_name)
+        if info.status == index.models.CollectionStatus.GREEN:
+            break
+        time.sleep(0.5)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recall, latency and RAM of the Qdrant storage profiles "
+        "(run: python -m benchmarks.qdrant_profile_benchmark --qdrant-url http://localhost:6333)"
+    )
+    parser.add_argument("--qdrant-url", default=QDRANT_URL)
+    parser.add_argument("--profiles", nargs="+", default=list(QDRANT_PROFILES))
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--text-bytes", type=int, default=800, help="chunk text size stored in the payload")
+    args = parser.parse_args()
+    if not args.qdrant_url or args.qdrant_url == ":memory:":
+        parser.error("needs a Qdrant server: local mode always does exact search and ignores the profile settings")
+
+    rng = np.random.default_rng(0)
+    vectors = clustered_vectors(rng, args.points, args.dim)
+    doc_ids = np.array([f"doc-{i % args.docs}" for i in range(args.points)])
+    query_rows = rng.choice(args.points, args.queries, replace=False)
+    queries = vectors[query_rows] + 0.05 * rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+    text = "x" * args.text_bytes
+
+    # Exact ground truth, over the whole collection and within the query's document.
+    scores = queries @ vectors.T
+    truth_all = np.argsort(-scores, axis=1)[:, : args.top_k]
+    truth_doc = []
+    for q, row in enumerate(query_rows):
+        rows = np.flatnonzero(doc_ids == doc_ids[row])
+        truth_doc.append(rows[np.argsort(-scores[q, rows])[: args.top_k]])
+
+    print(
+        f"{args.points} points, dim {args.dim}, {args.queries} queries, top-{args.top_k}\n\n"
+        f"{'profile':<10} {'index s':>8} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'doc recall':>10} {'doc p50':>8} {'doc p95':>8} {'hot RAM MB':>11}"
+    )
+    for name in args.profiles:
+        index = QdrantIndex(args.qdrant_url, QDRANT_API_KEY, f"bench_profile_{name}", args.dim, profile=name)
+        if index.client.collection_exists(index.collection_name):
+            index.client.delete_collection(index.collection_name)
+        index.ensure_collection()
+        ids = [str(uuid.UUID(int=i + 1)) for i in range(args.points)]
+        for start in range(0, args.points, 1000):
+            end = start + 1000
+            index.upsert(
+                ids[start:end],
+                vectors[start:end],
+                [{"doc_id": doc, "text": text} for doc in doc_ids[start:end]],
+            )
+        indexing = wait_until_indexed(index)
+
+        row_of = {point_id: row for row, point_id in enumerate(ids)}
+        results = {}
+        for label, doc_filter, truth in (("all", False, truth_all), ("doc", True, truth_doc)):
+            latencies, hits = [], 0
+            for q, row in enumerate(query_rows):
+                start = time.perf_counter()
+                found = index.search(queries[q], doc_ids[row] if doc_filter else None, args.top_k)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len({row_of[hit.id] for hit in found} & set(truth[q]))
+            results[label] = (hits / (args.queries * args.top_k), percentile(latencies, 50), percentile(latencies, 95))
+
+        recall, p50, p95 = results["all"]
+        doc_recall, doc_p50, doc_p95 = results["doc"]
+        hot_mb = index.profile.hot_bytes(args.points, args.dim) / 1e6
+        print(
+            f"{name:<10} {indexing:>8.1f} {recall:>7.1%} {p50:>7.2f} {p95:>7.2f} "
+            f"{doc_recall:>10.1%} {doc_p50:>8.2f} {doc_p95:>8.2f} {hot_mb:>11.0f}"
+        )
+        index.client.delete_collection(index.collection_name)
+
+    print("\nhot RAM: estimated vectors + quantized vectors + HNSW links held in memory (payload excluded)")
+
+
+if __name__ == "__main__":
+    main()
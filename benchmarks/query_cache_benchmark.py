@@ -0,0 +1,75 @@
+import argparse
+import random
+import time
+
+from benchmarks.corpus import synthetic_markdown, synthetic_queries
+from integrations.query_cache import QueryCache
+from integrations.rag_implementation import MarkdownVectorStore
+
+
+def rephrase(rng: random.Random, question: str) -> str:
+    # What students retype: case, spacing and punctuation, or a trailing word.
+    variants = [
+        question,
+        question.lower(),
+        question.rstrip("?") + " ?",
+        "  " + question.upper() + "  ",
+        question.rstrip("?") + " please?",
+        question.replace("How does", "how does"),
+    ]
+    return rng.choice(variants)
+
+
+def run(store: MarkdownVectorStore, workload, reingest_at: int, sections: int) -> float:
+    start = time.perf_counter()
+    for i, (question, doc_id) in enumerate(workload):
+        if i == reingest_at:
+            store.ingest_text(synthetic_markdown(sections, seed=99), doc_id="doc-0")
+        store.query(question, doc_id=doc_id)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="RAG query cache on a repeated-question workload (run: python -m benchmarks.query_cache_benchmark)"
+    )
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--sections", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=40, help="distinct questions per document")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=None, help="cosine threshold (default: QUERY_CACHE_SIMILARITY)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    base = synthetic_queries(args.questions)
+    # A few questions are asked far more often than the rest.
+    weights = [1 / (rank + 1) for rank in range(len(base))]
+    workload = [
+        (rephrase(rng, rng.choices(base, weights)[0]), f"doc-{rng.randrange(args.docs)}")
+        for _ in range(args.queries)
+    ]
+
+    timings = {}
+    for label, cached in (("no cache", False), ("cache", True)):
+        store = MarkdownVectorStore(
+            qdrant_url=":memory:",
+            qdrant_api_key=None,
+            collection_name=f"bench_query_cache_{cached}",
+            use_embedding_cache=False,
+            use_query_cache=cached,
+        )
+        if cached and args.threshold is not None:
+            store.query_cache = QueryCache(similarity_threshold=args.threshold)
+        for d in range(args.docs):
+            store.ingest_text(synthetic_markdown(args.sections, seed=d), doc_id=f"doc-{d}")
+        timings[label] = run(store, workload, args.queries // 2, args.sections)
+        if cached:
+            print(store.query_cache.format_stats())
+
+    print(f"{args.queries} queries ({args.questions} questions x {args.docs} docs, doc-0 re-ingested halfway)")
+    for label, seconds in timings.items():
+        print(f"  {label:<9} {seconds:6.2f}s  {seconds / args.queries * 1000:6.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.corpus import synthetic_markdown, synthetic_queries
+from config.settings import QDRANT_API_KEY, QDRANT_URL
+from integrations.rag_implementation import MarkdownVectorStore
+
+
+def time_call(fn, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="query_many vs. a loop over query (run: python -m benchmarks.query_many_benchmark)"
+    )
+    parser.add_argument("--queries", type=int, nargs="+", default=[1, 10, 20, 50])
+    parser.add_argument("--sections", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--qdrant-url", default=QDRANT_URL or ":memory:")
+    args = parser.parse_args()
+
+    store = MarkdownVectorStore(
+        qdrant_url=args.qdrant_url,
+        qdrant_api_key=QDRANT_API_KEY,
+        collection_name="bench_query_many",
+        use_embedding_cache=False,
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "notes.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(synthetic_markdown(args.sections))
+        ingest = store.ingest_markdown(path, doc_id="bench", incremental=True)
+    print(f"Indexed {ingest['chunks_total']} chunks at {args.qdrant_url}\n")
+
+    print(f"{'queries':>8} {'loop (ms)':>12} {'batched (ms)':>13} {'speedup':>8}")
+    for count in args.queries:
+        queries = synthetic_queries(count)
+        loop = time_call(
+            lambda: [store.query(q, doc_id="bench") for q in queries], args.repeat
+        )
+        batched = time_call(lambda: store.query_many(queries, doc_id="bench"), args.repeat)
+        loop_ms = statistics.median(loop) * 1000
+        batched_ms = statistics.median(batched) * 1000
+        print(f"{count:>8} {loop_ms:>12.1f} {batched_ms:>13.1f} {loop_ms / batched_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
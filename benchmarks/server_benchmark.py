@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# NotionSettings refuses to start without a token; the fake Notion API ignores it.
+os.environ.setdefault("NOTION_API_KEY", "benchmark")
+
+import httpx
+
+from benchmarks.e2e_benchmark import BenchmarkNotionSync
+from benchmarks.fakes import FakeNotionServer, FakeTranscriptService, MockOpenRouterServer
+from integrations.rag_implementation import MarkdownVectorStore
+from services.ai_notes_service import AINotesService
+from services.batch_pipeline import build_video_pipeline
+from services.langchain_notes_service import LangChainNotesService
+from services.notes_server import NotesServer
+from services.openrouter_client import OpenRouterClient
+from services.token_packer import TokenCounter, TranscriptPacker
+
+QUESTIONS = [
+    "What is the main idea of the lecture?",
+    "Which examples were given?",
+    "Summarize the first section.",
+    "What code was shown?",
+    "What are the key definitions?",
+    "How does the speaker conclude?",
+]
+
+
+async def ingest(client: httpx.AsyncClient, server: NotesServer, videos: int) -> float:
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.post("/jobs", json={"video_id": f"serve{i:04d}"}) for i in range(videos))
+    )
+    job_ids = [response.json()["id"] for response in responses if response.status_code == 202]
+    for job_id in job_ids:
+        await asyncio.to_thread(server.jobs.wait, job_id)
+    return time.perf_counter() - start
+
+
+async def fire_queries(client: httpx.AsyncClient, total: int, concurrency: int, videos: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/query",
+                json={"query": QUESTIONS[i % len(QUESTIONS)], "doc_id": f"serve{i % videos:04d}"},
+            )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "qps": total / wall,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def run(args, server: NotesServer) -> None:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://server", timeout=None) as client:
+        wall = await ingest(client, server, args.videos)
+        jobs = (await client.get("/jobs")).json()["jobs"]
+        for job in jobs:
+            if job["status"] == "failed":
+                print(f"  ✗ {job['video_id']} failed in {job['failed_stage']}: {job['error']}")
+        done = sum(1 for job in jobs if job["status"] == "done")
+        print(f"{done}/{args.videos} videos ingested through the job queue in {wall:.1f}s")
+
+        for batch_size in (1, args.batch_size):
+            server.query_batcher.max_batch_size = batch_size
+            server.query_batcher.max_wait = 0 if batch_size == 1 else args.batch_wait_ms / 1000
+            stats = await fire_queries(client, args.queries, args.concurrency, args.videos)
+            label = "unbatched" if batch_size == 1 else f"micro-batched (<= {batch_size}, {args.batch_wait_ms:g} ms)"
+            print(f"  {label:<36} {stats['qps']:7.1f} queries/s  p50={stats['p50'] * 1000:.1f} ms  "
+                  f"p95={stats['p95'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Server mode benchmark against in-memory Qdrant (run: python -m benchmarks.server_benchmark)"
+    )
+    parser.add_argument("--videos", type=int, default=6)
+    parser.add_argument("--segments", type=int, default=600, help="caption segments per video")
+    parser.add_argument("--workers", type=int, default=2, help="ingest job workers")
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32, help="queries in flight")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-wait-ms", type=float, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    args = parser.parse_args()
+
+    llm = MockOpenRouterServer(args.llm_latency).start()
+    notion = FakeNotionServer(0.01).start()
+    client = OpenRouterClient(api_key="benchmark", url=llm.chat_url, backoff_base=0.05)
+    vector_store = MarkdownVectorStore(
+        qdrant_url=":memory:",
+        qdrant_api_key=None,
+        collection_name="bench_server",
+        use_embedding_cache=False,
+        # Repeated questions would be answered from the cache, not batched.
+        use_query_cache=False,
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline = build_video_pipeline(
+                transcript_service=FakeTranscriptService(args.segments),
+                notes_service=LangChainNotesService(
+                    ai_service=AINotesService(use_cache=False, client=client),
+                    packer=TranscriptPacker(TokenCounter(None), context_tokens=8000),
+                ),
+                notion_client=BenchmarkNotionSync(notion.api_url, os.path.join(tmp, "notion")),
+                vector_store=vector_store,
+                output_dir=os.path.join(tmp, "output"),
+            )
+            server = NotesServer(vector_store=vector_store, pipeline=pipeline, workers=args.workers)
+            try:
+                asyncio.run(run(args, server))
+            finally:
+                server.close()
+    finally:
+        llm.stop()
+        notion.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from benchmarks.corpus import synthetic_captions
+from config.settings import TRANSCRIPT_CACHE_DIR
+from domain.prompt_builder import PromptBuilder
+from domain.transcript_compactor import TranscriptCompactor
+from services.token_packer import TokenCounter
+
+
+def load_corpus(root: str) -> dict:
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(root, "*", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        corpus[data.get("video_id") or os.path.basename(os.path.dirname(path))] = data["segments"]
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Transcript compaction size/speed "
+        "(run: python -m benchmarks.transcript_compaction_benchmark)"
+    )
+    parser.add_argument("--root", default=TRANSCRIPT_CACHE_DIR, help="TranscriptStore directory")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="add N synthetic videos of 2000 segments each")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.root)
+    for i in range(args.synthetic):
+        corpus[f"synthetic-{i}"] = synthetic_captions(2000, seed=i)
+    if not corpus:
+        parser.error(f"No stored transcripts under {args.root}; pass --synthetic N")
+
+    compactor = TranscriptCompactor()
+    counter = TokenCounter()
+    print(f"Token counts via {counter.source}")
+    print(f"{'video':<16} {'segments':>8} {'sentences':>9} {'chars':>16} {'prompt tokens':>17} {'saved':>6}")
+
+    totals = {"segments": 0, "tokens_before": 0, "tokens_after": 0, "seconds": 0.0}
+    for video_id, segments in corpus.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            sentences = compactor.compact(segments)
+            best = min(best, time.perf_counter() - start)
+        stats = compactor.stats(segments, sentences)
+        raw_text = "\n".join(segment["text"] for segment in segments)
+        tokens_before = counter.count(PromptBuilder.build(raw_text))
+        tokens_after = counter.count(PromptBuilder.build(compactor.to_text(sentences)))
+
+        totals["segments"] += len(segments)
+        totals["tokens_before"] += tokens_before
+        totals["tokens_after"] += tokens_after
+        totals["seconds"] += best
+        print(
+            f"{video_id[:16]:<16} {stats['segments']:>8} {stats['sentences']:>9} "
+            f"{stats['chars_before']:>7} -> {stats['chars_after']:<6} "
+            f"{tokens_before:>7} -> {tokens_after:<7} {stats['reduction']:>6.0%}"
+        )
+
+    saved = 1 - totals["tokens_after"] / totals["tokens_before"]
+    print(
+        f"\n{len(corpus)} videos: {totals['tokens_before']} -> {totals['tokens_after']} prompt tokens "
+        f"({saved:.0%} fewer), compaction at "
+        f"{totals['segments'] / totals['seconds']:.0f} segments/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
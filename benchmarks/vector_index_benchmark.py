@@ -0,0 +1,86 @@
+import argparse
+import statistics
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+from config.settings import QDRANT_API_KEY
+from integrations.vector_index import LocalVectorIndex, QdrantIndex
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def fill(index, vectors: np.ndarray, docs: int, batch_size: int = 1000) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(vectors), batch_size):
+        batch = vectors[i : i + batch_size]
+        rows = range(i, i + len(batch))
+        index.upsert(
+            [str(uuid.UUID(int=row + 1)) for row in rows],
+            batch,
+            [{"doc_id": f"doc-{row % docs}", "text": f"chunk {row}"} for row in rows],
+        )
+    index.flush()
+    return time.perf_counter() - start
+
+
+def time_queries(index, queries: np.ndarray, doc_id, top_k: int) -> list[float]:
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, doc_id, top_k)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local NumPy index vs. Qdrant search latency "
+        "(run: python -m benchmarks.vector_index_benchmark)"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=4)
+    parser.add_argument("--qdrant-url", default=":memory:")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    print(
+        f"{'backend':<8} {'vectors':>8} {'ingest s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p50 doc ms':>11} {'p95 doc ms':>11}"
+    )
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim)).astype(np.float32)
+        with tempfile.TemporaryDirectory() as tmp:
+            backends = {
+                "local": LocalVectorIndex(tmp, args.dim),
+                "qdrant": QdrantIndex(
+                    args.qdrant_url, QDRANT_API_KEY, f"bench_index_{size}", args.dim
+                ),
+            }
+            for name, index in backends.items():
+                index.ensure_collection()
+                ingest = fill(index, vectors, args.docs)
+                time_queries(index, queries[:10], None, args.top_k)
+                unfiltered = time_queries(index, queries, None, args.top_k)
+                filtered = time_queries(index, queries, "doc-7", args.top_k)
+                print(
+                    f"{name:<8} {size:>8} {ingest:>9.2f} "
+                    f"{statistics.median(unfiltered):>8.2f} {percentile(unfiltered, 95):>8.2f} "
+                    f"{statistics.median(filtered):>11.2f} {percentile(filtered, 95):>11.2f}"
+                )
+                if name == "qdrant" and args.qdrant_url != ":memory:":
+                    index.client.delete_collection(index.collection_name)
+
+
+if __name__ == "__main__":
+    main()
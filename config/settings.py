@@ -5,6 +5,8 @@ dotenv.load_dotenv()
 
 #config for notion
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
+# When set, notes are published directly under this page instead of via the LLM + MCP tools.
+NOTION_PARENT_PAGE_ID = os.getenv("NOTION_PARENT_PAGE_ID")
 
 #config for Open Router 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
@@ -16,4 +18,89 @@ APP_REFERER = "http://localhost"
 #config for qdrant
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_URL = os.getenv("QDRANT_URL")
-COLLECTION_NAME = "youtube_notes"
\ No newline at end of file
+COLLECTION_NAME = "youtube_notes"
+
+#config for notes generation
+NOTES_MAX_CONCURRENCY = int(os.getenv("NOTES_MAX_CONCURRENCY", "4"))
+# Transcripts are packed into requests of at most NOTES_CONTEXT_TOKENS, keeping
+# NOTES_MAX_OUTPUT_TOKENS free for the generated notes. NOTES_TOKENIZER is a
+# Hugging Face repo whose tokenizer matches OPENROUTER_MODEL.
+NOTES_TOKEN_PACKING = os.getenv("NOTES_TOKEN_PACKING", "1") == "1"
+NOTES_CONTEXT_TOKENS = int(os.getenv("NOTES_CONTEXT_TOKENS", "32000"))
+NOTES_MAX_OUTPUT_TOKENS = int(os.getenv("NOTES_MAX_OUTPUT_TOKENS", "4096"))
+NOTES_TOKENIZER = os.getenv("NOTES_TOKENIZER", "nvidia/NVIDIA-Nemotron-3-Nano-30B-A3B-BF16")
+
+#config for the LLM response cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+#config for transcripts
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", ".cache/transcripts")
+TRANSCRIPT_MAX_WORKERS = int(os.getenv("TRANSCRIPT_MAX_WORKERS", "8"))
+TRANSCRIPT_COMPACTION = os.getenv("TRANSCRIPT_COMPACTION", "1") == "1"
+
+#config for batch ingestion
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "8"))
+BATCH_TRANSCRIPT_WORKERS = int(os.getenv("BATCH_TRANSCRIPT_WORKERS", "4"))
+BATCH_NOTES_WORKERS = int(os.getenv("BATCH_NOTES_WORKERS", "4"))
+BATCH_NOTION_WORKERS = int(os.getenv("BATCH_NOTION_WORKERS", "2"))
+BATCH_INDEX_WORKERS = int(os.getenv("BATCH_INDEX_WORKERS", "1"))
+
+#config for the embedding cache
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+EMBEDDING_CACHE_CAPACITY = int(os.getenv("EMBEDDING_CACHE_CAPACITY", "100000"))
+
+#config for the embedding backend ("torch" = sentence-transformers, "onnx" = ONNX Runtime; 0 threads = runtime default)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "0") == "1"
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", ".cache/onnx")
+
+#config for the RAG query cache (exact LRU on query text, then cosine similarity per doc_id)
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") == "1"
+QUERY_CACHE_CAPACITY = int(os.getenv("QUERY_CACHE_CAPACITY", "1024"))
+QUERY_CACHE_SIMILARITY = float(os.getenv("QUERY_CACHE_SIMILARITY", "0.95"))
+QUERY_CACHE_PER_DOC = int(os.getenv("QUERY_CACHE_PER_DOC", "256"))
+
+#config for the vector index ("qdrant" or "local"; defaults to local when QDRANT_URL is unset)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND")
+LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", ".cache/vector_index")
+
+#config for the Qdrant storage profile (default, recall, balanced or compact; see integrations/vector_index.py)
+QDRANT_PROFILE = os.getenv("QDRANT_PROFILE", "default")
+
+#config for the Notion HTTP client (Notion allows ~3 requests/second per integration)
+NOTION_RATE_LIMIT = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+NOTION_HTTP2 = os.getenv("NOTION_HTTP2", "0") == "1"
+
+#config for incremental Notion sync
+NOTION_SYNC_STATE_DIR = os.getenv("NOTION_SYNC_STATE_DIR", ".cache/notion_sync")
+
+#config for the shared OpenRouter HTTP client
+OPENROUTER_CONNECT_TIMEOUT = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT", "10"))
+OPENROUTER_READ_TIMEOUT = float(os.getenv("OPENROUTER_READ_TIMEOUT", "120"))
+OPENROUTER_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "4"))
+OPENROUTER_POOL_SIZE = int(os.getenv("OPENROUTER_POOL_SIZE", "16"))
+OPENROUTER_BREAKER_THRESHOLD = int(os.getenv("OPENROUTER_BREAKER_THRESHOLD", "5"))
+OPENROUTER_BREAKER_RESET = float(os.getenv("OPENROUTER_BREAKER_RESET", "30"))
+
+#config for tracing (spans are exported as one JSON file per run when enabled)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", ".cache/traces")
+# Only the most recent spans are kept, so a long-running server stays bounded.
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "100000"))
+
+#config for server mode (python main.py --serve)
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_INGEST_WORKERS = int(os.getenv("SERVER_INGEST_WORKERS", "2"))
+SERVER_JOB_QUEUE_SIZE = int(os.getenv("SERVER_JOB_QUEUE_SIZE", "32"))
+SERVER_QUERY_BATCH_SIZE = int(os.getenv("SERVER_QUERY_BATCH_SIZE", "32"))
+SERVER_QUERY_BATCH_WAIT_MS = float(os.getenv("SERVER_QUERY_BATCH_WAIT_MS", "5"))
+SERVER_QUERY_TIMEOUT = float(os.getenv("SERVER_QUERY_TIMEOUT", "30"))
+# Larger top_k values are clamped; each distinct value is its own cache scope and search group.
+SERVER_MAX_TOP_K = int(os.getenv("SERVER_MAX_TOP_K", "20"))
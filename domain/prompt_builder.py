@@ -1,4 +1,7 @@
 class PromptBuilder:
+    # Bump whenever BASE_PROMPT changes so cached LLM responses are not reused.
+    VERSION = "1"
+
     BASE_PROMPT = """
 You are an expert software engineer and computer science instructor.
 
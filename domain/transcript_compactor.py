@@ -0,0 +1,119 @@
+import html
+import re
+from typing import Dict, Iterable, List, Optional
+
+
+class TranscriptCompactor:
+    """Shrinks raw caption segments into timestamped sentences in one pass.
+
+    - drops non-speech markers such as [Music], (applause), ♪ and >> speaker tags
+    - drops filler words (um, uh, ...)
+    - removes the words a rolling auto-caption line repeats from the previous one
+    - merges fragments into sentences, ending them at punctuation, at a pause
+      between segments or once they reach `max_sentence_words`
+
+    Each sentence keeps the start of its first and the end of its last segment.
+    """
+
+    _MARKERS = re.compile(
+        r"\[[^\]]*\]"
+        r"|\((?:music|applause|laughter|laughs|inaudible|silence|cheering)[^)]*\)"
+        r"|[♪♫]+"
+        r"|>>",
+        re.IGNORECASE,
+    )
+    FILLERS = {"um", "umm", "uh", "uhh", "uhm", "erm", "er", "hmm", "mm", "ah", "eh"}
+    _SENTENCE_END = re.compile(r"[.!?。！？]['\")\]]*$")
+
+    def __init__(
+        self,
+        max_overlap_words: int = 20,
+        max_sentence_words: int = 40,
+        min_sentence_words: int = 4,
+        pause_seconds: float = 2.0,
+        fillers: Optional[Iterable[str]] = None,
+    ):
+        self.max_overlap_words = max_overlap_words
+        self.max_sentence_words = max_sentence_words
+        self.min_sentence_words = min_sentence_words
+        self.pause_seconds = pause_seconds
+        self.fillers = set(fillers) if fillers is not None else self.FILLERS
+
+    def _clean_words(self, text: str) -> List[str]:
+        text = self._MARKERS.sub(" ", html.unescape(text))
+        return [
+            word
+            for word in text.split()
+            if word.strip(",.!?;:").lower() not in self.fillers
+        ]
+
+    @staticmethod
+    def _key(word: str) -> str:
+        return word.strip(",.!?;:\"'").lower()
+
+    def _overlap(self, tail: List[str], words: List[str]) -> int:
+        # Longest suffix of the previous words that the new segment starts
+        # with; bounded by max_overlap_words, so each segment costs O(k^2).
+        # A one-word match only counts when it is the whole segment, so a
+        # genuinely repeated word ("very very") survives.
+        limit = min(len(tail), len(words), self.max_overlap_words)
+        for size in range(limit, 0, -1):
+            if size == 1 and len(words) > 1:
+                break
+            if tail[-size:] == [self._key(word) for word in words[:size]]:
+                return size
+        return 0
+
+    def compact(self, segments: List[Dict]) -> List[Dict]:
+        sentences: List[Dict] = []
+        words: List[str] = []
+        tail: List[str] = []  # normalized recent words, for overlap detection
+        start = end = None
+
+        def emit():
+            nonlocal words, start
+            if words:
+                sentences.append({"text": " ".join(words), "start": start, "end": end})
+            words, start = [], None
+
+        for segment in segments:
+            seg_start = float(segment.get("start", 0.0))
+            seg_end = seg_start + float(segment.get("duration", 0.0))
+            new_words = self._clean_words(segment.get("text", ""))
+            new_words = new_words[self._overlap(tail, new_words):]
+            if not new_words:
+                continue
+
+            if words and end is not None and seg_start - end > self.pause_seconds:
+                emit()
+            for word in new_words:
+                if start is None:
+                    start = seg_start
+                words.append(word)
+                end = seg_end
+                if len(words) >= self.max_sentence_words or (
+                    len(words) >= self.min_sentence_words and self._SENTENCE_END.search(word)
+                ):
+                    emit()
+
+            tail.extend(self._key(word) for word in new_words)
+            if len(tail) > 2 * self.max_overlap_words:
+                del tail[: -self.max_overlap_words]
+        emit()
+        return sentences
+
+    @staticmethod
+    def to_text(sentences: List[Dict]) -> str:
+        return "\n".join(sentence["text"] for sentence in sentences)
+
+    @staticmethod
+    def stats(segments: List[Dict], sentences: List[Dict]) -> Dict:
+        chars_before = sum(len(segment.get("text", "")) + 1 for segment in segments)
+        chars_after = sum(len(sentence["text"]) + 1 for sentence in sentences)
+        return {
+            "segments": len(segments),
+            "sentences": len(sentences),
+            "chars_before": chars_before,
+            "chars_after": chars_after,
+            "reduction": 1 - chars_after / chars_before if chars_before else 0.0,
+        }
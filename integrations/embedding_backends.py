@@ -0,0 +1,154 @@
+import os
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from config.settings import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_ONNX_DIR,
+    EMBEDDING_ONNX_QUANTIZE,
+    EMBEDDING_THREADS,
+)
+
+
+class SentenceTransformerBackend:
+    """The model's own PyTorch pipeline through sentence-transformers."""
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        threads: int = EMBEDDING_THREADS,
+    ):
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.name = "torch"
+        self.cache_key = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        # sentence-transformers already sorts each call by length.
+        return np.asarray(self.model.encode(texts, batch_size=self.batch_size), dtype=np.float32)
+
+
+class OnnxEmbeddingBackend:
+    """Runs the model's ONNX export with ONNX Runtime on CPU.
+
+    Texts are sorted by token count and batched in that order, so each batch
+    is padded only to its own longest text. With `quantize` the weights are
+    converted to int8 once (dynamic quantization) and cached under `model_dir`.
+    Pooling and normalization follow bge: CLS token, then L2 norm.
+    """
+
+    ONNX_FILE = "onnx/model.onnx"
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        threads: int = EMBEDDING_THREADS,
+        quantize: bool = EMBEDDING_ONNX_QUANTIZE,
+        model_dir: str = EMBEDDING_ONNX_DIR,
+        max_length: int = 512,
+        pooling: str = "cls",
+        length_buckets: bool = True,
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("The onnx embedding backend requires onnxruntime (pip install onnxruntime)") from e
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"Unknown pooling: {pooling}")
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.pooling = pooling
+        self.length_buckets = length_buckets
+        self.name = "onnx-int8" if quantize else "onnx"
+        # fp32 ONNX matches PyTorch to float precision; int8 vectors do not.
+        self.cache_key = f"{model_name}:int8" if quantize else model_name
+
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(model_name, "tokenizer.json"))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=max_length)
+
+        model_path = hf_hub_download(model_name, self.ONNX_FILE)
+        if quantize:
+            model_path = self._quantized(model_path, model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.dim = self.session.get_outputs()[0].shape[-1]
+
+    def _quantized(self, model_path: str, model_dir: str) -> str:
+        target = os.path.join(model_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", self.model_name), "model_int8.onnx")
+        if not os.path.exists(target):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp = f"{target}.tmp"
+            quantize_dynamic(model_path, tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, target)
+        return target
+
+    def _run(self, encodings) -> np.ndarray:
+        width = max(len(encoding.ids) for encoding in encodings)
+        input_ids = np.zeros((len(encodings), width), dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), width), dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            input_ids[row, : len(encoding.ids)] = encoding.ids
+            attention_mask[row, : len(encoding.ids)] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling == "cls":
+            vectors = hidden[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            vectors = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return vectors
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = list(range(len(texts)))
+        if self.length_buckets:
+            order.sort(key=lambda i: len(encodings[i].ids))
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start : start + self.batch_size]
+            vectors[rows] = self._run([encodings[i] for i in rows])
+        return vectors
+
+
+BACKENDS = {
+    "torch": SentenceTransformerBackend,
+    "onnx": OnnxEmbeddingBackend,
+}
+
+
+def create_embedding_backend(model_name: str, backend: Optional[str] = EMBEDDING_BACKEND, **kwargs):
+    backend = backend or "torch"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend](model_name, **kwargs)
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from config.settings import EMBEDDING_CACHE_CAPACITY, EMBEDDING_CACHE_DIR
+
+
+class EmbeddingCache:
+    """Fixed-capacity LRU cache of embeddings in a memory-mapped array.
+
+    Vectors live in ``vectors.bin`` (one row per slot) and ``index.json``
+    maps chunk hashes to slots in least-recently-used order.
+    Each embedding model gets its own directory so dimensions never mix.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        root: str = EMBEDDING_CACHE_DIR,
+        capacity: int = EMBEDDING_CACHE_CAPACITY,
+        dtype: str = "float16",
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self.capacity = capacity
+        self.dtype = dtype
+        self.path = os.path.join(root, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._open()
+
+    def _open(self) -> None:
+        index_path = os.path.join(self.path, "index.json")
+        vectors_path = os.path.join(self.path, "vectors.bin")
+        meta = {"dim": self.dim, "dtype": self.dtype, "capacity": self.capacity}
+
+        entries = []
+        if os.path.exists(index_path) and os.path.exists(vectors_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("meta") == meta:
+                entries = stored["entries"]
+
+        mode = "r+" if entries else "w+"
+        self.vectors = np.memmap(
+            vectors_path, dtype=self.dtype, mode=mode, shape=(self.capacity, self.dim)
+        )
+        self.index: "OrderedDict[str, int]" = OrderedDict(entries)
+        used = set(self.index.values())
+        self.free_slots = [slot for slot in range(self.capacity - 1, -1, -1) if slot not in used]
+        self._meta = meta
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        result = np.zeros((len(texts), self.dim), dtype=np.float32)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = self.key(text)
+                slot = self.index.get(key)
+                if slot is None:
+                    missing.append(i)
+                    continue
+                self.index.move_to_end(key)
+                result[i] = self.vectors[slot]
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return result, missing
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                slot = self.index.get(key)
+                if slot is None:
+                    if self.free_slots:
+                        slot = self.free_slots.pop()
+                    else:
+                        _, slot = self.index.popitem(last=False)
+                        self.evictions += 1
+                    self.index[key] = slot
+                else:
+                    self.index.move_to_end(key)
+                self.vectors[slot] = vector
+
+    def flush(self) -> None:
+        with self._lock:
+            self.vectors.flush()
+            index_path = os.path.join(self.path, "index.json")
+            tmp_path = f"{index_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"meta": self._meta, "entries": list(self.index.items())}, f)
+            os.replace(tmp_path, index_path)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.index),
+            "capacity": self.capacity,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,152 @@
+import json
+import re
+from typing import Any, Dict, List
+
+
+class MarkdownToNotionConverter:
+    """Converts the notes Markdown we generate into Notion block JSON.
+
+    Covers what PromptBuilder asks the model for: headings, bullet and
+    numbered lists, fenced code, quotes, dividers and paragraphs with
+    **bold** / `code` spans. Text is split to respect Notion's 2000-character
+    limit per rich text object and 100 rich text objects per block.
+    """
+
+    MAX_TEXT_LENGTH = 2000
+    MAX_RICH_TEXT_ITEMS = 100
+    CODE_LANGUAGES = {
+        "": "plain text",
+        "py": "python",
+        "python": "python",
+        "python3": "python",
+        "sh": "shell",
+        "bash": "bash",
+        "shell": "shell",
+        "json": "json",
+        "js": "javascript",
+        "javascript": "javascript",
+        "sql": "sql",
+        "text": "plain text",
+    }
+
+    _HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+    _BULLET = re.compile(r"^\s*[-*+]\s+(.*)$")
+    _NUMBERED = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+    _FENCE = re.compile(r"^\s*```\s*([\w+-]*)\s*$")
+    _DIVIDER = re.compile(r"^\s*(-{3,}|\*{3,}|_{3,})\s*$")
+    _INLINE = re.compile(r"(\*\*[^*]+\*\*|`[^`]+`)")
+
+    def convert(self, markdown: str) -> List[Dict[str, Any]]:
+        blocks: List[Dict[str, Any]] = []
+        paragraph: List[str] = []
+        lines = markdown.splitlines()
+        i = 0
+
+        def flush_paragraph():
+            if paragraph:
+                blocks.append(self._text_block("paragraph", " ".join(paragraph)))
+                paragraph.clear()
+
+        while i < len(lines):
+            line = lines[i]
+            fence = self._FENCE.match(line)
+            if fence:
+                flush_paragraph()
+                code_lines = []
+                i += 1
+                while i < len(lines) and not self._FENCE.match(lines[i]):
+                    code_lines.append(lines[i])
+                    i += 1
+                blocks.append(self._code_block("\n".join(code_lines), fence.group(1)))
+                i += 1
+                continue
+
+            stripped = line.strip()
+            heading = self._HEADING.match(stripped)
+            bullet = self._BULLET.match(line)
+            numbered = self._NUMBERED.match(line)
+
+            if not stripped:
+                flush_paragraph()
+            elif heading:
+                flush_paragraph()
+                level = min(3, len(heading.group(1)))
+                blocks.append(self._text_block(f"heading_{level}", heading.group(2)))
+            elif self._DIVIDER.match(line):
+                flush_paragraph()
+                blocks.append({"object": "block", "type": "divider", "divider": {}})
+            elif bullet:
+                flush_paragraph()
+                blocks.append(self._text_block("bulleted_list_item", bullet.group(1)))
+            elif numbered:
+                flush_paragraph()
+                blocks.append(self._text_block("numbered_list_item", numbered.group(1)))
+            elif stripped.startswith(">"):
+                flush_paragraph()
+                blocks.append(self._text_block("quote", stripped.lstrip("> ")))
+            else:
+                paragraph.append(stripped)
+            i += 1
+
+        flush_paragraph()
+        return blocks
+
+    def _text_block(self, block_type: str, text: str) -> Dict[str, Any]:
+        return {
+            "object": "block",
+            "type": block_type,
+            block_type: {"rich_text": self._rich_text(text)},
+        }
+
+    def _code_block(self, code: str, language: str) -> Dict[str, Any]:
+        return {
+            "object": "block",
+            "type": "code",
+            "code": {
+                "rich_text": self._plain_rich_text(code),
+                "language": self.CODE_LANGUAGES.get(language.lower(), "plain text"),
+            },
+        }
+
+    def _plain_rich_text(self, text: str, annotations=None) -> List[Dict[str, Any]]:
+        items = []
+        for start in range(0, max(1, len(text)), self.MAX_TEXT_LENGTH):
+            item = {"type": "text", "text": {"content": text[start : start + self.MAX_TEXT_LENGTH]}}
+            if annotations:
+                item["annotations"] = annotations
+            items.append(item)
+        return items[: self.MAX_RICH_TEXT_ITEMS]
+
+    def _rich_text(self, text: str) -> List[Dict[str, Any]]:
+        items = []
+        for part in self._INLINE.split(text):
+            if not part:
+                continue
+            if part.startswith("**") and part.endswith("**"):
+                items.extend(self._plain_rich_text(part[2:-2], {"bold": True}))
+            elif part.startswith("`") and part.endswith("`"):
+                items.extend(self._plain_rich_text(part[1:-1], {"code": True}))
+            else:
+                items.extend(self._plain_rich_text(part))
+        return items[: self.MAX_RICH_TEXT_ITEMS] or self._plain_rich_text("")
+
+    @staticmethod
+    def batches(
+        blocks: List[Dict[str, Any]],
+        max_blocks: int = 100,
+        max_bytes: int = 400_000,
+    ) -> List[List[Dict[str, Any]]]:
+        # Notion accepts at most 100 children and ~500 KB per request.
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        size = 0
+        for block in blocks:
+            block_size = len(json.dumps(block, ensure_ascii=False).encode("utf-8"))
+            if current and (len(current) >= max_blocks or size + block_size > max_bytes):
+                batches.append(current)
+                current, size = [], 0
+            current.append(block)
+            size += block_size
+        if current:
+            batches.append(current)
+        return batches
@@ -1,7 +1,13 @@
+import json
+import time
+
 import requests
-from llm_ai import AINotesService
+from requests.adapters import HTTPAdapter
+from services.llm_for_agent import AIService
+from utils.tracing import tracer
 
 MCP_SERVER_URL = "http://localhost:8000"
+TOOLS_CACHE_TTL = 300
 
 
 SYSTEM_PROMPT = """
@@ -16,50 +22,116 @@ You can:
 When the user asks to store or manage content in Notion,
 you MUST call the appropriate tool.
 
+All tool calls in one response run together as a batch, numbered from 0
+in the order you make them. To use the result of an earlier call, pass
+{"$ref": "<number>.data.id"} as the argument value. For example, to add
+content to a page you create in call 0, call append_block_children with
+"block_id": {"$ref": "0.data.id"}. A call that must wait for others
+without using their result can list their numbers in a "depends_on"
+argument, e.g. "depends_on": ["0"].
+
 Think step by step and use tools when required.
 """
 
 
 class NotionMCPClient:
     def __init__(self):
-        self.ai = AINotesService()
-
-    def list_tools(self):
-        r = requests.get(f"{MCP_SERVER_URL}/tools")
-        r.raise_for_status()
-        return r.json()["tools"]
+        self.ai = AIService()
+        # One keep-alive session for every call to the MCP server.
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+        self._tools = None
+        self._tools_fetched_at = 0.0
+
+    def list_tools(self, refresh: bool = False):
+        if (
+            refresh
+            or self._tools is None
+            or time.monotonic() - self._tools_fetched_at > TOOLS_CACHE_TTL
+        ):
+            r = self.session.get(f"{MCP_SERVER_URL}/tools")
+            r.raise_for_status()
+            self._tools = r.json()["tools"]
+            self._tools_fetched_at = time.monotonic()
+        return self._tools
 
     def call_tool(self, tool_name: str, arguments: dict):
-        r = requests.post(
-            f"{MCP_SERVER_URL}/tools/{tool_name}",
-            json=arguments,
-        )
-        r.raise_for_status()
-        return r.json()
+        with tracer.span("mcp_client.call_tool", tool=tool_name) as span:
+            r = self.session.post(
+                f"{MCP_SERVER_URL}/tools/{tool_name}",
+                json=arguments,
+            )
+            span.set(status=r.status_code, bytes=len(r.content))
+            r.raise_for_status()
+            return r.json()
+
+    def call_tools(self, calls: list):
+        """Runs several tool calls in one request to POST /tools/batch.
+
+        Each call is {"id", "tool", "arguments", optional "depends_on"};
+        arguments may reference earlier results as {"$ref": "<id>.data.id"}.
+        """
+        with tracer.span("mcp_client.call_tools", calls=len(calls)) as span:
+            r = self.session.post(
+                f"{MCP_SERVER_URL}/tools/batch",
+                json={"calls": calls},
+            )
+            span.set(status=r.status_code, bytes=len(r.content))
+            r.raise_for_status()
+            return r.json()["results"]
 
     def run(self, user_prompt: str):
+        with tracer.span("mcp_client.run"):
+            self._run(user_prompt)
+
+    def publish(self, key: str, title: str, markdown: str):
+        # The agent creates a new page every time; key is only used by NotionPageSync.
+        self.run(
+            f"""
+    Create a Notion page titled "{title}"
+    and add the following markdown content as paragraphs:
+
+{markdown}
+"""
+        )
+
+    def _run(self, user_prompt: str):
         # 1️⃣ Fetch MCP tools
         tools = self.list_tools()
 
         # 2️⃣ Call LLM with tools
-        response = self.ai.generate_notes_with_tools(
+        response = self.ai.llm_with_tools(
             system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             tools=tools,
+            cache=False,
         )
 
         message = response["choices"][0]["message"]
 
-        # 3️⃣ Execute tool calls
+        # 3️⃣ Execute tool calls in a single batch round trip
         if "tool_calls" in message:
-            for call in message["tool_calls"]:
+            calls = []
+            last_created = None
+            for index, call in enumerate(message["tool_calls"]):
                 tool_name = call["function"]["name"]
                 args = call["function"]["arguments"]
+                if isinstance(args, str):
+                    args = json.loads(args or "{}")
+                depends_on = [str(dep) for dep in args.pop("depends_on", None) or []]
+                # An append without a target right after a create is meant
+                # for the new page.
+                if tool_name == "create_page":
+                    last_created = str(index)
+                elif tool_name == "append_block_children" and not args.get("block_id") and last_created:
+                    args["block_id"] = {"$ref": f"{last_created}.data.id"}
 
                 print(f"\n🔧 Calling MCP tool: {tool_name}")
                 print(f"📦 Args: {args}")
+                # Ids are the call positions the system prompt tells the model to reference.
+                calls.append({"id": str(index), "tool": tool_name, "arguments": args, "depends_on": depends_on})
 
-                result = self.call_tool(tool_name, args)
+            for result in self.call_tools(calls):
                 print(f"✅ Tool result: {result}")
 
         else:
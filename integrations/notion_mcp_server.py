@@ -1,11 +1,18 @@
-import os
+import asyncio
+import importlib.util
+import json
+import random
+import re
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
 import httpx
 from fastmcp import FastMCP
-from fastapi import Body
 from starlette.responses import JSONResponse, PlainTextResponse
-from config.settings import NOTION_API_KEY
+from config.settings import NOTION_API_KEY, NOTION_HTTP2, NOTION_MAX_RETRIES, NOTION_RATE_LIMIT
+from utils.tracing import metrics, tracer
 
 
 class NotionSettings:
@@ -26,37 +33,144 @@ class NotionSettings:
         }
 
 
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
 class AsyncHttpClient:
-    def __init__(self, base_url: str, headers: Dict[str, str]):
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    _ID_SEGMENT = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        rate_limit: float = NOTION_RATE_LIMIT,
+        max_retries: int = NOTION_MAX_RETRIES,
+        http2: bool = NOTION_HTTP2,
+        timeout: float = 30,
+    ):
         self.base_url = base_url
         self.headers = headers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        # One bucket per server: every tool call shares Notion's request budget.
+        self.limiter = TokenBucket(rate_limit, burst=max(1, int(rate_limit)))
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"requests": 0, "retries": 0, "errors": 0, "total_latency": 0.0, "max_latency": 0.0}
+        )
+        self._client: Optional[httpx.AsyncClient] = None
 
-    async def get(self, path: str, params: Optional[Dict[str, Any]] = None):
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.get(
-                f"{self.base_url}{path}",
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
                 headers=self.headers,
-                params=params,
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
             )
-        return self._normalize(r)
+        return self._client
+
+    def _endpoint(self, method: str, path: str) -> str:
+        segments = ["{id}" if self._ID_SEGMENT.match(part) else part for part in path.split("/")]
+        return f"{method} {'/'.join(segments)}"
+
+    def _retry_delay(self, response: Optional[httpx.Response], attempt: int) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+        return min(30.0, 0.5 * 2 ** attempt) * (0.5 + random.random())
+
+    async def _request(self, method: str, path: str, **kwargs):
+        endpoint = self._endpoint(method, path)
+        with tracer.span("notion.request", endpoint=endpoint) as span:
+            result = await self._send(endpoint, span, method, path, **kwargs)
+            span.set(status=result["status_code"])
+            return result
+
+    async def _send(self, endpoint: str, span, method: str, path: str, **kwargs):
+        stats = self.stats[endpoint]
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await self._get_client().request(method, path, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    stats["errors"] += 1
+                    raise
+            finally:
+                latency = time.perf_counter() - start
+                stats["requests"] += 1
+                stats["total_latency"] += latency
+                stats["max_latency"] = max(stats["max_latency"], latency)
+                status = response.status_code if response is not None else "error"
+                metrics.inc("notion_http_requests_total", endpoint=endpoint, status=status)
+                metrics.observe("notion_http_request_seconds", latency, endpoint=endpoint)
+
+            if response is not None and (
+                response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries
+            ):
+                if not response.is_success:
+                    stats["errors"] += 1
+                span.set(bytes=len(response.content))
+                return self._normalize(response)
+
+            stats["retries"] += 1
+            metrics.inc("notion_http_retries_total", endpoint=endpoint)
+            span.add("retries")
+            await asyncio.sleep(self._retry_delay(response, attempt))
+            attempt += 1
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None):
+        return await self._request("GET", path, params=params)
 
     async def post(self, path: str, body: Dict[str, Any]):
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.post(
-                f"{self.base_url}{path}",
-                headers=self.headers,
-                json=body,
-            )
-        return self._normalize(r)
+        return await self._request("POST", path, json=body)
 
     async def patch(self, path: str, body: Dict[str, Any]):
-        async with httpx.AsyncClient(timeout=30) as client:
-            r = await client.patch(
-                f"{self.base_url}{path}",
-                headers=self.headers,
-                json=body,
-            )
-        return self._normalize(r)
+        return await self._request("PATCH", path, json=body)
+
+    async def delete(self, path: str):
+        return await self._request("DELETE", path)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats_snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            endpoint: {
+                **values,
+                "avg_latency": values["total_latency"] / values["requests"] if values["requests"] else 0.0,
+            }
+            for endpoint, values in self.stats.items()
+        }
 
     def _normalize(self, response: httpx.Response):
         try:
@@ -128,44 +242,91 @@ class NotionClient:
         self,
         block_id: str,
         children: List[Dict[str, Any]],
+        after: Optional[str] = None,
     ):
-        return await self.http.patch(
-            f"/blocks/{block_id}/children",
-            {"children": children},
-        )
+        body = {"children": children}
+        if after is not None:
+            body["after"] = after
+        return await self.http.patch(f"/blocks/{block_id}/children", body)
+
+    async def list_block_children(self, block_id: str):
+        blocks = []
+        cursor = None
+        while True:
+            params = {"page_size": 100}
+            if cursor:
+                params["start_cursor"] = cursor
+            response = await self.http.get(f"/blocks/{block_id}/children", params)
+            if not response["ok"]:
+                return response
+            blocks.extend(response["data"]["results"])
+            if not response["data"].get("has_more"):
+                return {**response, "data": {"results": blocks}}
+            cursor = response["data"]["next_cursor"]
+
+    async def update_block(self, block_id: str, block: Dict[str, Any]):
+        block_type = block["type"]
+        return await self.http.patch(f"/blocks/{block_id}", {block_type: block[block_type]})
+
+    async def delete_block(self, block_id: str):
+        return await self.http.delete(f"/blocks/{block_id}")
 
     async def archive_page(self, page_id: str):
         return await self.update_page(page_id, archived=True)
 
 
 class NotionMCPServer:
+    TOOLS = (
+        "create_page",
+        "update_page",
+        "get_page",
+        "append_block_children",
+        "archive_page",
+    )
+
     def __init__(self):
         settings = NotionSettings()
-        http_client = AsyncHttpClient(
+        self.http = AsyncHttpClient(
             base_url=settings.BASE_URL,
             headers=settings.headers,
         )
-        self.notion = NotionClient(http_client)
-        self.mcp = FastMCP("NotionConnector")
+        self.notion = NotionClient(self.http)
+        self.mcp = FastMCP("NotionConnector", lifespan=self._lifespan)
         self._register_tools()
         self._register_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, _server):
+        try:
+            yield
+        finally:
+            await self.http.aclose()
+
     def _register_tools(self):
         @self.mcp.tool()
-        async def create_page(**kwargs):
-            return await self.notion.create_page(**kwargs)
+        async def create_page(
+            parent_page_id: str,
+            title: str,
+            properties: Optional[Dict[str, Any]] = None,
+            children: Optional[List[Dict[str, Any]]] = None,
+        ):
+            return await self.notion.create_page(parent_page_id, title, properties, children)
 
         @self.mcp.tool()
-        async def update_page(**kwargs):
-            return await self.notion.update_page(**kwargs)
+        async def update_page(
+            page_id: str,
+            properties: Optional[Dict[str, Any]] = None,
+            archived: Optional[bool] = None,
+        ):
+            return await self.notion.update_page(page_id, properties, archived)
 
         @self.mcp.tool()
         async def get_page(page_id: str):
             return await self.notion.get_page(page_id)
 
         @self.mcp.tool()
-        async def append_block_children(**kwargs):
-            return await self.notion.append_block_children(**kwargs)
+        async def append_block_children(block_id: str, children: List[Dict[str, Any]]):
+            return await self.notion.append_block_children(block_id, children)
 
         @self.mcp.tool()
         async def archive_page(page_id: str):
@@ -176,25 +337,44 @@ class NotionMCPServer:
         async def health(_):
             return PlainTextResponse("OK")
 
+        @self.mcp.custom_route("/metrics", methods=["GET"])
+        async def prometheus_metrics(_):
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+        @self.mcp.custom_route("/stats/http", methods=["GET"])
+        async def http_stats(_):
+            return JSONResponse(self.http.stats_snapshot())
+
         @self.mcp.custom_route("/tools", methods=["GET"])
         async def list_tools(_):
-            return JSONResponse(
-                {
-                    "tools": [
-                        "create_page",
-                        "update_page",
-                        "get_page",
-                        "append_block_children",
-                        "archive_page",
-                    ]
-                }
-            )
+            return JSONResponse({"tools": list(self.TOOLS)})
+
+        # Registered before /tools/{tool_name} so "batch" is not taken as a tool name.
+        @self.mcp.custom_route("/tools/batch", methods=["POST"])
+        async def call_tools_batch(request):
+            try:
+                body = await request.json()
+                calls = body["calls"]
+                with tracer.span("mcp.batch", calls=len(calls)):
+                    results = await self._run_batch(calls)
+                return JSONResponse({"results": results})
+            except (KeyError, TypeError, ValueError) as e:
+                return JSONResponse(
+                    {"error": f"Invalid batch: {e}"},
+                    status_code=400,
+                )
 
         @self.mcp.custom_route("/tools/{tool_name}", methods=["POST"])
-        async def call_tool(_, tool_name: str, body=Body(...)):
+        async def call_tool(request):
+            tool_name = request.path_params["tool_name"]
             try:
+                body = await request.json()
+                if tool_name not in self.TOOLS:
+                    raise AttributeError(tool_name)
                 handler = getattr(self.notion, tool_name)
-                result = await handler(**body)
+                metrics.inc("mcp_tool_calls_total", tool=tool_name)
+                with tracer.span("mcp.tool", tool=tool_name):
+                    result = await handler(**body)
                 return JSONResponse(result)
             except AttributeError:
                 return JSONResponse(
@@ -207,6 +387,93 @@ class NotionMCPServer:
                     status_code=500,
                 )
 
+    @staticmethod
+    def _find_refs(value: Any, refs: List[str]) -> List[str]:
+        if isinstance(value, dict):
+            if set(value) == {"$ref"}:
+                refs.append(value["$ref"].split(".", 1)[0])
+            else:
+                for item in value.values():
+                    NotionMCPServer._find_refs(item, refs)
+        elif isinstance(value, list):
+            for item in value:
+                NotionMCPServer._find_refs(item, refs)
+        return refs
+
+    @staticmethod
+    def _resolve_refs(value: Any, results: Dict[str, Any]) -> Any:
+        if isinstance(value, dict):
+            if set(value) == {"$ref"}:
+                call_id, _, path = value["$ref"].partition(".")
+                resolved = results[call_id]
+                for key in filter(None, path.split(".")):
+                    resolved = resolved[int(key)] if isinstance(resolved, list) else resolved[key]
+                return resolved
+            return {key: NotionMCPServer._resolve_refs(item, results) for key, item in value.items()}
+        if isinstance(value, list):
+            return [NotionMCPServer._resolve_refs(item, results) for item in value]
+        return value
+
+    async def _run_batch(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Executes tool calls concurrently where they are independent.
+
+        A call depends on the calls named in its ``depends_on`` list, on any
+        call referenced as ``{"$ref": "<id>.data.id"}`` in its arguments, and
+        on the previous call that targets the same page or block, so appends
+        to one page keep their order.
+        """
+        ids = [str(call.get("id", index)) for index, call in enumerate(calls)]
+        if len(set(ids)) != len(ids):
+            raise ValueError("call ids must be unique")
+        for call in calls:
+            if call.get("tool") not in self.TOOLS:
+                raise ValueError(f"unknown tool {call.get('tool')!r}")
+
+        dependencies: Dict[str, List[str]] = {}
+        last_for_target: Dict[str, str] = {}
+        for call_id, call in zip(ids, calls):
+            arguments = call.get("arguments") or {}
+            deps = list(call.get("depends_on", [])) + self._find_refs(arguments, [])
+            target = arguments.get("block_id") or arguments.get("page_id")
+            if target is not None:
+                target_key = json.dumps(target, sort_keys=True)
+                if target_key in last_for_target:
+                    deps.append(last_for_target[target_key])
+                last_for_target[target_key] = call_id
+            for dep in deps:
+                if dep not in ids or ids.index(dep) >= ids.index(call_id):
+                    raise ValueError(f"call {call_id} depends on unknown or later call {dep}")
+            dependencies[call_id] = deps
+
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(call_id: str, call: Dict[str, Any]) -> Dict[str, Any]:
+            for dep in dependencies[call_id]:
+                dep_result = await tasks[dep]
+                if not dep_result.get("ok"):
+                    return {"ok": False, "status_code": 424, "error": f"dependency {dep} failed"}
+            try:
+                arguments = self._resolve_refs(call.get("arguments") or {}, results)
+                metrics.inc("mcp_tool_calls_total", tool=call["tool"])
+                with tracer.span("mcp.tool", tool=call["tool"], call_id=call_id):
+                    result = await getattr(self.notion, call["tool"])(**arguments)
+            except Exception as e:
+                result = {"ok": False, "status_code": 500, "error": str(e)}
+            results[call_id] = result
+            return result
+
+        # Tasks are created in list order; every dependency points backwards,
+        # so awaiting a dependency's task is always safe.
+        for call_id, call in zip(ids, calls):
+            tasks[call_id] = asyncio.ensure_future(execute(call_id, call))
+        outcomes = await asyncio.gather(*tasks.values())
+
+        return [
+            {"id": call_id, "tool": call["tool"], **outcome}
+            for call_id, call, outcome in zip(ids, calls, outcomes)
+        ]
+
     def run(self):
         self.mcp.run(transport="http")
 
@@ -0,0 +1,241 @@
+import asyncio
+import difflib
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from config.settings import NOTION_PARENT_PAGE_ID, NOTION_SYNC_STATE_DIR
+from integrations.notion_markdown import MarkdownToNotionConverter
+
+
+class NotionPageSync:
+    """Keeps one Notion page in sync with a notes Markdown document.
+
+    The block ids and content hashes from the last sync are stored per key
+    (e.g. video id). On the next sync the new blocks are diffed against them
+    and only the changed blocks are updated, archived or inserted.
+
+    State is saved after every step. If a sync fails part way, the state is
+    left marked stale and the next sync reads the page back instead.
+    """
+
+    def __init__(
+        self,
+        parent_page_id: Optional[str] = NOTION_PARENT_PAGE_ID,
+        notion=None,
+        state_dir: str = NOTION_SYNC_STATE_DIR,
+    ):
+        self.parent_page_id = parent_page_id
+        self.notion = notion
+        self.state_dir = state_dir
+        self.converter = MarkdownToNotionConverter()
+
+    def _default_client(self):
+        from integrations.notion_mcp_server import AsyncHttpClient, NotionClient, NotionSettings
+
+        settings = NotionSettings()
+        return NotionClient(AsyncHttpClient(base_url=settings.BASE_URL, headers=settings.headers))
+
+    def _state_path(self, key: str) -> str:
+        return os.path.join(self.state_dir, f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', key)}.json")
+
+    def _load_state(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._state_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self, key: str, state: Dict[str, Any]) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self._state_path(key)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def block_hash(block: Dict[str, Any]) -> str:
+        # Works for both our converter output and blocks read back from
+        # Notion, which carry extra fields (plain_text, full annotations).
+        block_type = block["type"]
+        body = block.get(block_type) or {}
+        parts = [
+            (
+                (item.get("text") or {}).get("content", item.get("plain_text", "")),
+                bool((item.get("annotations") or {}).get("bold")),
+                bool((item.get("annotations") or {}).get("code")),
+            )
+            for item in body.get("rich_text", [])
+        ]
+        canonical = json.dumps([block_type, parts, body.get("language")], ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _check(response: Dict[str, Any], action: str) -> Dict[str, Any]:
+        if not response["ok"]:
+            raise RuntimeError(f"Notion {action} failed: {response['error']}")
+        return response
+
+    async def _read_back(self, notion, page_id: str) -> List[Dict[str, str]]:
+        response = self._check(await notion.list_block_children(page_id), "list_block_children")
+        return [
+            {"id": block["id"], "hash": self.block_hash(block), "type": block["type"]}
+            for block in response["data"]["results"]
+            if not block.get("archived")
+        ]
+
+    async def _append(self, notion, page_id: str, blocks, after: Optional[str]) -> List[str]:
+        ids = []
+        for batch in self.converter.batches(blocks):
+            response = self._check(
+                await notion.append_block_children(page_id, batch, after=after),
+                "append_block_children",
+            )
+            # The append response lists the page's children from the insert
+            # point onwards; the first len(batch) are the ones we just created.
+            created = [block["id"] for block in response["data"]["results"][: len(batch)]]
+            ids.extend(created)
+            after = created[-1]
+        return ids
+
+    async def sync(
+        self,
+        key: str,
+        title: str,
+        markdown: str,
+        page_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        notion = self.notion or self._default_client()
+        try:
+            return await self._sync(notion, key, title, markdown, page_id)
+        finally:
+            if self.notion is None:
+                await notion.http.aclose()
+
+    async def _sync(self, notion, key, title, markdown, page_id) -> Dict[str, Any]:
+        new_blocks = self.converter.convert(markdown)
+        new_hashes = [self.block_hash(block) for block in new_blocks]
+        report = {"skipped": 0, "updated": 0, "created": 0, "archived": 0}
+
+        state = self._load_state(key)
+        if state is not None:
+            page_id = state["page_id"]
+            old = await self._read_back(notion, page_id) if state.get("stale") else state["blocks"]
+        elif page_id is not None:
+            old = await self._read_back(notion, page_id)
+        else:
+            if not self.parent_page_id:
+                raise RuntimeError("Set NOTION_PARENT_PAGE_ID in environment variables")
+            page = self._check(
+                await notion.create_page(parent_page_id=self.parent_page_id, title=title),
+                "create_page",
+            )
+            page_id = page["data"]["id"]
+            old = []
+            # Saved before anything else so a failed first sync reuses the page.
+            self._save_blocks(key, page_id, [], [], [])
+
+        old_hashes = [block["hash"] for block in old]
+        matcher = difflib.SequenceMatcher(None, old_hashes, new_hashes, autojunk=False)
+        opcodes = matcher.get_opcodes()
+
+        # Notion can only insert after an existing block, so content that has
+        # to go before the first surviving block forces a full rewrite.
+        if old and opcodes and opcodes[0][0] in ("insert", "replace") and opcodes[0][1] == 0:
+            first = opcodes[0]
+            same_types = all(
+                old[first[1] + k]["type"] == new_blocks[first[3] + k]["type"]
+                for k in range(min(first[2] - first[1], first[4] - first[3]))
+            )
+            if first[0] == "insert" or not same_types:
+                opcodes = [("delete", 0, len(old), 0, 0), ("insert", 0, 0, 0, len(new_blocks))]
+
+        new_ids: List[Optional[str]] = [None] * len(new_blocks)
+        pending_updates = []
+        pending_archives = []
+        inserts: List[List[int]] = []  # runs of consecutive new block indices
+
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                for k in range(i2 - i1):
+                    new_ids[j1 + k] = old[i1 + k]["id"]
+                report["skipped"] += i2 - i1
+                continue
+
+            paired = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+            inserted = []
+            for k in range(paired):
+                old_block, j = old[i1 + k], j1 + k
+                if old_block["type"] == new_blocks[j]["type"]:
+                    pending_updates.append((old_block["id"], new_blocks[j]))
+                    new_ids[j] = old_block["id"]
+                else:
+                    pending_archives.append(old_block["id"])
+                    inserted.append(j)
+            pending_archives.extend(block["id"] for block in old[i1 + paired : i2])
+            inserted.extend(range(j1 + paired, j2))
+            for j in inserted:
+                if inserts and inserts[-1][-1] == j - 1:
+                    inserts[-1].append(j)
+                else:
+                    inserts.append([j])
+
+        # Updates and archives are independent of each other; the shared rate
+        # limiter in AsyncHttpClient keeps them within Notion's request budget.
+        if pending_updates or pending_archives:
+            self._mark_stale(key, page_id)
+            await asyncio.gather(
+                *(self._run_update(notion, block_id, block) for block_id, block in pending_updates),
+                *(self._run_archive(notion, block_id) for block_id in pending_archives),
+            )
+            report["updated"] = len(pending_updates)
+            report["archived"] = len(pending_archives)
+            self._save_blocks(key, page_id, new_ids, new_hashes, new_blocks)
+
+        # Inserts are sequential and anchored on the block now preceding them.
+        for indices in inserts:
+            anchor = next(
+                (new_ids[j] for j in range(indices[0] - 1, -1, -1) if new_ids[j] is not None),
+                None,
+            )
+            self._mark_stale(key, page_id)
+            created = await self._append(notion, page_id, [new_blocks[j] for j in indices], anchor)
+            for j, block_id in zip(indices, created):
+                new_ids[j] = block_id
+            report["created"] += len(created)
+            self._save_blocks(key, page_id, new_ids, new_hashes, new_blocks)
+
+        self._save_blocks(key, page_id, new_ids, new_hashes, new_blocks)
+        return {"page_id": page_id, **report}
+
+    def _save_blocks(self, key: str, page_id: str, ids, hashes, blocks) -> None:
+        # Blocks not created yet (id None) are left out, so the saved list
+        # always matches what is on the page.
+        self._save_state(
+            key,
+            {
+                "page_id": page_id,
+                "blocks": [
+                    {"id": block_id, "hash": block_hash, "type": block["type"]}
+                    for block_id, block_hash, block in zip(ids, hashes, blocks)
+                    if block_id is not None
+                ],
+            },
+        )
+
+    def _mark_stale(self, key: str, page_id: str) -> None:
+        self._save_state(key, {"page_id": page_id, "stale": True, "blocks": []})
+
+    async def _run_update(self, notion, block_id: str, block: Dict[str, Any]) -> None:
+        self._check(await notion.update_block(block_id, block), "update_block")
+
+    async def _run_archive(self, notion, block_id: str) -> None:
+        self._check(await notion.delete_block(block_id), "delete_block")
+
+    def sync_blocking(self, key: str, title: str, markdown: str, page_id: Optional[str] = None):
+        return asyncio.run(self.sync(key, title, markdown, page_id))
+
+    def publish(self, key: str, title: str, markdown: str) -> Dict[str, Any]:
+        return self.sync_blocking(key, title, markdown)
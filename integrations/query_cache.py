@@ -0,0 +1,188 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import QUERY_CACHE_CAPACITY, QUERY_CACHE_PER_DOC, QUERY_CACHE_SIMILARITY
+from utils.tracing import metrics
+
+
+class _Entry:
+    __slots__ = ("result", "encode_seconds", "search_seconds")
+
+    def __init__(self, result: Dict[str, Any], encode_seconds: float, search_seconds: float):
+        self.result = result
+        self.encode_seconds = encode_seconds
+        self.search_seconds = search_seconds
+
+
+class QueryCache:
+    """Two-tier cache of retrieved context, scoped by doc_id and top_k.
+
+    - exact: LRU keyed on the normalized query text; a hit skips both the
+      embedding pass and the search
+    - semantic: the most recent query vectors per doc_id; a new query whose
+      cosine similarity to one of them reaches `similarity_threshold`
+      reuses its context and skips the search. Each tier holds at most
+      `capacity` entries; the least recently used (doc_id, top_k) scope
+      gives up its oldest vectors first.
+
+    `invalidate(doc_id)` drops everything cached for that document, and
+    unfiltered (doc_id None) entries, which may include it. The cache is
+    per process, so only ingests in the same process invalidate it.
+    """
+
+    def __init__(
+        self,
+        capacity: int = QUERY_CACHE_CAPACITY,
+        similarity_threshold: float = QUERY_CACHE_SIMILARITY,
+        per_doc: int = QUERY_CACHE_PER_DOC,
+    ):
+        self.capacity = capacity
+        self.similarity_threshold = similarity_threshold
+        self.per_doc = per_doc
+        self._exact: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._semantic: "OrderedDict[Tuple, List[Tuple[np.ndarray, _Entry]]]" = OrderedDict()
+        self._semantic_size = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; results computed before one are not stored.
+        self.generation = 0
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        text = re.sub(r"\s+", " ", text.strip().lower())
+        return text.rstrip(" ?!.")
+
+    @staticmethod
+    def _hit(entry: _Entry, query_text: str, tier: str) -> Dict[str, Any]:
+        return {**entry.result, "query": query_text, "cache": tier}
+
+    def get_exact(self, query_text: str, doc_id: Optional[str], top_k: int) -> Optional[Dict[str, Any]]:
+        key = (doc_id, top_k, self.normalize(query_text))
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None:
+                return None
+            self._exact.move_to_end(key)
+            self.exact_hits += 1
+            saved = entry.encode_seconds + entry.search_seconds
+            self.saved_seconds += saved
+        metrics.inc("query_cache_requests_total", tier="exact")
+        metrics.inc("query_cache_saved_seconds_total", saved)
+        return self._hit(entry, query_text, "exact")
+
+    def get_similar(
+        self, query_text: str, vector: np.ndarray, doc_id: Optional[str], top_k: int
+    ) -> Optional[Dict[str, Any]]:
+        vector = self._unit(vector)
+        with self._lock:
+            best = self._nearest((doc_id, top_k), vector)
+            if best is None:
+                self.misses += 1
+            else:
+                self._semantic.move_to_end((doc_id, top_k))
+                self.semantic_hits += 1
+                self.saved_seconds += best.search_seconds
+                # Remember the wording too, so repeating it skips the encode.
+                self._store_exact((doc_id, top_k, self.normalize(query_text)), best)
+        metrics.inc("query_cache_requests_total", tier="semantic" if best is not None else "miss")
+        if best is None:
+            return None
+        metrics.inc("query_cache_saved_seconds_total", best.search_seconds)
+        return self._hit(best, query_text, "semantic")
+
+    def put(
+        self,
+        query_text: str,
+        vector: np.ndarray,
+        doc_id: Optional[str],
+        top_k: int,
+        result: Dict[str, Any],
+        encode_seconds: float = 0.0,
+        search_seconds: float = 0.0,
+        generation: Optional[int] = None,
+    ) -> None:
+        entry = _Entry(dict(result), encode_seconds, search_seconds)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._store_exact((doc_id, top_k, self.normalize(query_text)), entry)
+            key = (doc_id, top_k)
+            vector = self._unit(vector)
+            # A near-duplicate would only crowd out distinct questions.
+            if self._nearest(key, vector) is not None:
+                return
+            candidates = self._semantic.setdefault(key, [])
+            self._semantic.move_to_end(key)
+            candidates.append((vector, entry))
+            self._semantic_size += 1
+            if len(candidates) > self.per_doc:
+                del candidates[0]
+                self._semantic_size -= 1
+            while self._semantic_size > self.capacity:
+                oldest_key, oldest = next(iter(self._semantic.items()))
+                del oldest[0]
+                self._semantic_size -= 1
+                if not oldest:
+                    del self._semantic[oldest_key]
+
+    def _nearest(self, key: Tuple, vector: np.ndarray) -> Optional[_Entry]:
+        # Caller holds the lock.
+        candidates = self._semantic.get(key)
+        if not candidates:
+            return None
+        similarities = np.stack([cached for cached, _ in candidates]) @ vector
+        row = int(np.argmax(similarities))
+        if similarities[row] >= self.similarity_threshold:
+            return candidates[row][1]
+        return None
+
+    def _store_exact(self, key: Tuple, entry: _Entry) -> None:
+        # Caller holds the lock.
+        self._exact[key] = entry
+        self._exact.move_to_end(key)
+        while len(self._exact) > self.capacity:
+            self._exact.popitem(last=False)
+
+    def invalidate(self, doc_id: Optional[str]) -> None:
+        scopes = {doc_id, None}
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._exact if key[0] in scopes]:
+                del self._exact[key]
+            for key in [key for key in self._semantic if key[0] in scopes]:
+                self._semantic_size -= len(self._semantic.pop(key))
+
+    @staticmethod
+    def _unit(vector: np.ndarray) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "requests": total,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.exact_hits + self.semantic_hits) / total if total else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "entries": len(self._exact),
+                "semantic_entries": self._semantic_size,
+            }
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        return (
+            f"Query cache: {stats['requests']} queries, {stats['hit_ratio']:.0%} hits "
+            f"({stats['exact_hits']} exact, {stats['semantic_hits']} semantic, {stats['misses']} misses), "
+            f"{stats['saved_seconds'] * 1000:.0f} ms saved"
+        )
@@ -1,46 +1,103 @@
+import hashlib
 import os
+import threading
+import time
 import uuid
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, List, Dict, Optional
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from config.settings import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_CACHE_ENABLED,
+    LOCAL_INDEX_DIR,
+    QUERY_CACHE_ENABLED,
+    VECTOR_BACKEND,
+)
+from integrations.embedding_backends import create_embedding_backend
+from integrations.embedding_cache import EmbeddingCache
+from integrations.query_cache import QueryCache
+from integrations.vector_index import LocalVectorIndex, QdrantIndex
+from utils.tracing import propagate, traced, tracer
+
+POINT_ID_NAMESPACE = uuid.UUID("5b0d7c3e-6f1a-4e8b-9a57-2f3c1d4e6a80")
 
 
 class MarkdownVectorStore:
     def __init__(
         self,
-        qdrant_url: str,
-        qdrant_api_key: str,
+        qdrant_url: Optional[str],
+        qdrant_api_key: Optional[str],
         collection_name: str,
         embedding_model_name: str = "BAAI/bge-small-en-v1.5",
+        use_embedding_cache: bool = EMBEDDING_CACHE_ENABLED,
+        backend: Optional[str] = VECTOR_BACKEND,
+        embedding_backend: Optional[str] = EMBEDDING_BACKEND,
+        warm_up_in_background: bool = False,
+        use_query_cache: bool = QUERY_CACHE_ENABLED,
     ):
         self.collection_name = collection_name
-        self.client = QdrantClient(
-            url=qdrant_url,
-            api_key=qdrant_api_key,
-            timeout=60,
-        )
-        self.embedding_model = SentenceTransformer(embedding_model_name)
-        self._ensure_collection()
+        self._qdrant_url = qdrant_url
+        self._qdrant_api_key = qdrant_api_key
+        self._embedding_model_name = embedding_model_name
+        self._use_embedding_cache = use_embedding_cache
+        self._backend = backend
+        self._embedding_backend = embedding_backend
+        self._warm_error: Optional[BaseException] = None
+        self._warm_thread: Optional[threading.Thread] = None
+        self.query_cache = QueryCache() if use_query_cache else None
 
-    def _ensure_collection(self):
-        try:
-            self.client.get_collection(self.collection_name)
-        except Exception:
-            self.client.create_collection(
-                collection_name=self.collection_name,
-                vectors_config=models.VectorParams(
-                    size=384,
-                    distance=models.Distance.COSINE,
-                ),
+        if warm_up_in_background:
+            # Loading the model and connecting to the index take seconds; let
+            # callers fetch transcripts and generate notes in the meantime.
+            self._warm_thread = threading.Thread(target=self._warm_up_safely, daemon=True)
+            self._warm_thread.start()
+        else:
+            self._warm_up()
+
+    def _warm_up(self) -> None:
+        self.embedding_model = create_embedding_backend(self._embedding_model_name, self._embedding_backend)
+        dim = self.embedding_model.dim
+        self.embedding_cache = None
+        if self._use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                model_name=self.embedding_model.cache_key,
+                dim=dim,
             )
-            self.client.create_payload_index(
-                collection_name=self.collection_name,
-                field_name="doc_id",
-                field_schema=models.PayloadSchemaType.KEYWORD,
+
+        # Without a Qdrant URL we fall back to the embedded local index.
+        self.backend = self._backend or ("qdrant" if self._qdrant_url else "local")
+        if self.backend == "qdrant":
+            self.index = QdrantIndex(
+                self._qdrant_url, self._qdrant_api_key, self.collection_name, dim
+            )
+        elif self.backend == "local":
+            self.index = LocalVectorIndex(
+                os.path.join(LOCAL_INDEX_DIR, self.collection_name), dim
             )
+        else:
+            raise ValueError(f"Unknown vector backend: {self.backend}")
+        self.index.ensure_collection()
+
+    def _warm_up_safely(self) -> None:
+        try:
+            self._warm_up()
+        except BaseException as e:
+            self._warm_error = e
+
+    @property
+    def ready(self) -> bool:
+        if self._warm_thread is not None and self._warm_thread.is_alive():
+            return False
+        return self._warm_error is None
+
+    def wait_until_ready(self) -> None:
+        if self._warm_thread is not None:
+            self._warm_thread.join()
+        if self._warm_error is not None:
+            raise self._warm_error
 
     def _load_markdown(self, path: str) -> str:
         if not path.endswith(".md"):
@@ -54,6 +111,8 @@ class MarkdownVectorStore:
         chunk_size: int = 800,
         chunk_overlap: int = 150,
     ) -> List[str]:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
@@ -65,70 +124,316 @@ class MarkdownVectorStore:
             if len(chunk.strip()) > 20
         ]
 
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        with tracer.span("embedding.encode", texts=len(texts)) as span:
+            if self.embedding_cache is None:
+                return self.embedding_model.encode(texts)
+
+            vectors, missing = self.embedding_cache.get_many(texts)
+            span.set(cache_hits=len(texts) - len(missing))
+            if missing:
+                miss_texts = [texts[i] for i in missing]
+                encoded = self.embedding_model.encode(miss_texts)
+                vectors[missing] = encoded
+                self.embedding_cache.put_many(miss_texts, encoded)
+            return vectors
+
+    def _upsert(self, point_ids: List[str], vectors, payloads: List[Dict[str, str]]) -> None:
+        with tracer.span("vector.upsert", backend=self.backend, points=len(point_ids)):
+            self.index.upsert(point_ids, vectors, payloads)
+
+    def _stored_ids(self, doc_id: str):
+        with tracer.span("vector.stored_ids", backend=self.backend) as span:
+            stored_ids = self.index.stored_ids(doc_id)
+            span.set(points=len(stored_ids))
+            return stored_ids
+
+    def _delete(self, point_ids: List[str]) -> None:
+        with tracer.span("vector.delete", backend=self.backend, points=len(point_ids)):
+            self.index.delete(point_ids)
+
+    @staticmethod
+    def _point_id(doc_id: str, chunk_hash: str) -> str:
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_id}:{chunk_hash}"))
+
+    @staticmethod
+    def _payload(doc_id: str, chunk: Dict[str, str]) -> Dict[str, str]:
+        return {
+            "text": chunk["text"],
+            "doc_id": doc_id,
+            "chunk_hash": chunk["chunk_hash"],
+        }
+
+    def _upload_sequential(
+        self,
+        doc_id: str,
+        point_ids: List[str],
+        chunks_by_id: Dict[str, Dict[str, str]],
+        batch_size: int,
+    ) -> int:
+        chunks = [chunks_by_id[point_id]["text"] for point_id in point_ids]
+        embeddings = self._encode(chunks) if chunks else None
+
+        stored = 0
+        for i in range(0, len(chunks), batch_size):
+            batch_ids = point_ids[i : i + batch_size]
+            self._upsert(
+                batch_ids,
+                embeddings[i : i + batch_size],
+                [self._payload(doc_id, chunks_by_id[point_id]) for point_id in batch_ids],
+            )
+            stored += len(batch_ids)
+        return stored
+
+    def _upload_batch(
+        self,
+        point_ids: List[str],
+        vectors: np.ndarray,
+        payloads: List[Dict[str, str]],
+    ) -> int:
+        self._upsert(point_ids, vectors, payloads)
+        return len(point_ids)
+
+    def _upload_streaming(
+        self,
+        doc_id: str,
+        point_ids: List[str],
+        chunks_by_id: Dict[str, Dict[str, str]],
+        batch_size: int,
+        upload_parallelism: int,
+    ) -> int:
+        # Batch N+1 is encoded on this thread while up to `upload_parallelism`
+        # earlier batches are being upserted by the pool.
+        stored = 0
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=max(1, upload_parallelism)) as pool:
+            for i in range(0, len(point_ids), batch_size):
+                batch_ids = point_ids[i : i + batch_size]
+                vectors = np.asarray(
+                    self._encode([chunks_by_id[point_id]["text"] for point_id in batch_ids]),
+                    dtype=np.float32,
+                )
+                payloads = [self._payload(doc_id, chunks_by_id[point_id]) for point_id in batch_ids]
+
+                if len(in_flight) >= upload_parallelism:
+                    stored += in_flight.popleft().result()
+                in_flight.append(
+                    pool.submit(propagate(self._upload_batch), batch_ids, vectors, payloads)
+                )
+
+            while in_flight:
+                stored += in_flight.popleft().result()
+        return stored
+
     def ingest_markdown(
         self,
         file_path: str,
         doc_id: Optional[str] = None,
         batch_size: int = 50,
-    ) -> Dict[str, int]:
+        incremental: bool = False,
+        streaming: bool = False,
+        upload_parallelism: int = 4,
+    ) -> Dict[str, Any]:
+        return self.ingest_text(
+            self._load_markdown(file_path),
+            doc_id=doc_id,
+            batch_size=batch_size,
+            incremental=incremental,
+            streaming=streaming,
+            upload_parallelism=upload_parallelism,
+        )
+
+    @traced("index.ingest_text")
+    def ingest_text(
+        self,
+        raw_text: str,
+        doc_id: Optional[str] = None,
+        batch_size: int = 50,
+        incremental: bool = False,
+        streaming: bool = False,
+        upload_parallelism: int = 4,
+    ) -> Dict[str, Any]:
+        self.wait_until_ready()
         if doc_id is None:
             doc_id = str(uuid.uuid4())
 
-        raw_text = self._load_markdown(file_path)
-        chunks = self._chunk_text(raw_text)
-        embeddings = self.embedding_model.encode(chunks).tolist()
+        # Point ids are derived from (doc_id, chunk content), so re-ingesting
+        # the same notes overwrites points instead of duplicating them.
+        chunks_by_id: Dict[str, Dict[str, str]] = {}
+        for text in self._chunk_text(raw_text):
+            chunk_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            chunks_by_id.setdefault(
+                self._point_id(doc_id, chunk_hash),
+                {"text": text, "chunk_hash": chunk_hash},
+            )
 
-        stored = 0
-        for i in range(0, len(chunks), batch_size):
-            points = []
-            for text, vector in zip(
-                chunks[i : i + batch_size],
-                embeddings[i : i + batch_size],
-            ):
-                points.append(
-                    models.PointStruct(
-                        id=uuid.uuid4().int >> 64,
-                        vector=vector,
-                        payload={
-                            "text": text,
-                            "doc_id": doc_id,
-                        },
-                    )
-                )
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points,
+        stale_ids: List[str] = []
+        new_ids = list(chunks_by_id)
+        if incremental:
+            stored_ids = self._stored_ids(doc_id)
+            new_ids = [point_id for point_id in chunks_by_id if point_id not in stored_ids]
+            stale_ids = [point_id for point_id in stored_ids if point_id not in chunks_by_id]
+
+        start = time.perf_counter()
+        if streaming:
+            stored = self._upload_streaming(
+                doc_id, new_ids, chunks_by_id, batch_size, upload_parallelism
             )
-            stored += len(points)
+        else:
+            stored = self._upload_sequential(doc_id, new_ids, chunks_by_id, batch_size)
+        elapsed = time.perf_counter() - start
+
+        if stale_ids:
+            self._delete(stale_ids)
+        self.index.flush()
+        if self.query_cache is not None:
+            self.query_cache.invalidate(doc_id)
+
+        tracer.current().set(doc_id=doc_id, chunks_total=len(chunks_by_id), chunks_stored=stored)
+        result = {
+            "doc_id": doc_id,
+            "chunks_stored": stored,
+            "chunks_total": len(chunks_by_id),
+            "chunks_unchanged": len(chunks_by_id) - len(new_ids),
+            "chunks_deleted": len(stale_ids),
+            "points_per_sec": stored / elapsed if elapsed else 0.0,
+        }
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+            result["embedding_cache"] = self.embedding_cache.stats()
+        return result
+
+    @traced("index.ingest_sections")
+    def ingest_sections(
+        self,
+        sections: Iterable[str],
+        doc_id: Optional[str] = None,
+        batch_size: int = 50,
+    ) -> Dict[str, Any]:
+        """Incrementally ingests a document that is still being generated.
 
-        return {"doc_id": doc_id, "chunks_stored": stored}
+        Each section is chunked, embedded and upserted as soon as it arrives;
+        points left over from a previous version of the document are deleted
+        once the last section has been consumed.
+        """
+        self.wait_until_ready()
+        if doc_id is None:
+            doc_id = str(uuid.uuid4())
+
+        stored_ids = self._stored_ids(doc_id)
+        seen_ids = set()
+        stored = 0
+        sections_count = 0
+        start = time.perf_counter()
+        for section in sections:
+            sections_count += 1
+            chunks_by_id: Dict[str, Dict[str, str]] = {}
+            for text in self._chunk_text(section):
+                chunk_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                point_id = self._point_id(doc_id, chunk_hash)
+                if point_id not in seen_ids:
+                    seen_ids.add(point_id)
+                    chunks_by_id[point_id] = {"text": text, "chunk_hash": chunk_hash}
+            new_ids = [point_id for point_id in chunks_by_id if point_id not in stored_ids]
+            stored += self._upload_sequential(doc_id, new_ids, chunks_by_id, batch_size)
+        elapsed = time.perf_counter() - start
 
+        stale_ids = [point_id for point_id in stored_ids if point_id not in seen_ids]
+        if stale_ids:
+            self._delete(stale_ids)
+        self.index.flush()
+        if self.query_cache is not None:
+            self.query_cache.invalidate(doc_id)
+
+        tracer.current().set(doc_id=doc_id, sections=sections_count, chunks_stored=stored)
+        result = {
+            "doc_id": doc_id,
+            "sections": sections_count,
+            "chunks_stored": stored,
+            "chunks_total": len(seen_ids),
+            "chunks_unchanged": len(seen_ids) - stored,
+            "chunks_deleted": len(stale_ids),
+            "points_per_sec": stored / elapsed if elapsed else 0.0,
+        }
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+            result["embedding_cache"] = self.embedding_cache.stats()
+        return result
+
+    @traced("rag.query")
     def query(
         self,
         query_text: str,
         doc_id: Optional[str] = None,
         top_k: int = 4,
     ) -> Dict[str, str]:
-        query_vector = self.embedding_model.encode([query_text])[0].tolist()
-
-        query_filter = None
-        if doc_id:
-            query_filter = models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="doc_id",
-                        match=models.MatchValue(value=doc_id),
-                    )
-                ]
-            )
+        return self.query_many([query_text], doc_id=doc_id, top_k=top_k)[0]
 
-        hits = self.client.search(
-            collection_name=self.collection_name,
-            query_vector=query_vector,
-            query_filter=query_filter,
-            limit=top_k,
-        )
+    @traced("rag.query_many")
+    def query_many(
+        self,
+        queries: List[str],
+        doc_id: Optional[str] = None,
+        top_k: int = 4,
+        doc_ids: Optional[List[Optional[str]]] = None,
+    ) -> List[Dict[str, str]]:
+        """`doc_ids` gives each query its own document filter instead of `doc_id`.
+
+        With the query cache, repeated questions skip the encode and the
+        search, and near-duplicates skip the search.
+        """
+        self.wait_until_ready()
+        if not queries:
+            return []
+        if doc_ids is None:
+            doc_ids = [doc_id] * len(queries)
+
+        cache = self.query_cache
+        results: List[Any] = [None] * len(queries)
+        pending = list(range(len(queries)))
+        generation = None
+        if cache is not None:
+            generation = cache.generation
+            for i in pending:
+                results[i] = cache.get_exact(queries[i], doc_ids[i], top_k)
+            pending = [i for i in pending if results[i] is None]
+            if not pending:
+                tracer.current().set(cache_hits=len(queries))
+                return results
+
+        # One batched forward pass for all queries, then one batch search
+        # request per document filter.
+        start = time.perf_counter()
+        with tracer.span("embedding.encode", texts=len(pending)):
+            query_vectors = self.embedding_model.encode([queries[i] for i in pending])
+        encode_seconds = (time.perf_counter() - start) / len(pending)
+
+        groups: Dict[Optional[str], List[int]] = {}
+        for row, i in enumerate(pending):
+            if cache is not None:
+                results[i] = cache.get_similar(queries[i], query_vectors[row], doc_ids[i], top_k)
+                if results[i] is not None:
+                    continue
+            groups.setdefault(doc_ids[i], []).append(row)
+
+        misses = sum(len(rows) for rows in groups.values())
+        tracer.current().set(cache_hits=len(queries) - misses)
+        with tracer.span("vector.search", backend=self.backend, queries=misses, top_k=top_k):
+            for query_doc_id, rows in groups.items():
+                start = time.perf_counter()
+                hits = self.index.search_many(query_vectors[rows], query_doc_id, top_k)
+                search_seconds = (time.perf_counter() - start) / len(rows)
+                for row, row_hits in zip(rows, hits):
+                    i = pending[row]
+                    results[i] = self._format_result(queries[i], row_hits)
+                    if cache is not None:
+                        cache.put(
+                            queries[i], query_vectors[row], query_doc_id, top_k, results[i],
+                            encode_seconds, search_seconds, generation,
+                        )
+        return results
 
+    def _format_result(self, query_text: str, hits) -> Dict[str, str]:
         context = "\n".join(
             hit.payload["text"] for hit in hits
         )
@@ -0,0 +1,477 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from config.settings import QDRANT_PROFILE
+
+
+class SearchHit:
+    def __init__(self, point_id: str, score: float, payload: Dict[str, Any]):
+        self.id = point_id
+        self.score = score
+        self.payload = payload
+
+
+class QdrantProfile:
+    """Storage and search settings for the notes collection.
+
+    Payload (including chunk text) is kept on disk by default, as on a stock
+    Qdrant server; only the doc_id index is held in RAM.
+
+    `quantization` keeps a compressed copy of every vector in RAM ("scalar"
+    int8 or "binary" 1-bit); candidates found with it are rescored against
+    the full vectors, fetching `oversampling` times as many. With
+    `on_disk_vectors` the full vectors are memory-mapped instead of held in
+    RAM, so only the quantized vectors and the HNSW graph stay hot.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        hnsw_m: int = 16,
+        hnsw_ef_construct: int = 100,
+        search_ef: Optional[int] = None,
+        quantization: Optional[str] = None,
+        oversampling: float = 1.0,
+        rescore: bool = True,
+        on_disk_vectors: bool = False,
+        on_disk_payload: bool = True,
+    ):
+        if quantization not in (None, "scalar", "binary"):
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.name = name
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construct = hnsw_ef_construct
+        self.search_ef = search_ef
+        self.quantization = quantization
+        self.oversampling = oversampling
+        self.rescore = rescore
+        self.on_disk_vectors = on_disk_vectors
+        self.on_disk_payload = on_disk_payload
+
+    def quantization_config(self, models):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def search_params(self, models):
+        if self.search_ef is None and self.quantization is None:
+            return None
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+    def hot_bytes(self, points: int, dim: int) -> int:
+        """Rough RAM estimate for vectors and the HNSW graph (payload excluded)."""
+        vectors = 0 if self.on_disk_vectors else points * dim * 4
+        if self.quantization == "scalar":
+            vectors += points * dim
+        elif self.quantization == "binary":
+            vectors += points * dim // 8
+        graph = points * self.hnsw_m * 2 * 4
+        return vectors + graph
+
+
+# Binary quantization loses more precision at 384 dimensions than on large
+# models, hence the higher oversampling.
+QDRANT_PROFILES = {
+    "default": QdrantProfile("default"),
+    "recall": QdrantProfile("recall", hnsw_m=32, hnsw_ef_construct=256, search_ef=256),
+    "balanced": QdrantProfile(
+        "balanced",
+        hnsw_ef_construct=128,
+        search_ef=128,
+        quantization="scalar",
+        oversampling=2.0,
+        on_disk_vectors=True,
+    ),
+    "compact": QdrantProfile(
+        "compact",
+        search_ef=128,
+        quantization="binary",
+        oversampling=4.0,
+        on_disk_vectors=True,
+    ),
+}
+
+
+class QdrantIndex:
+    def __init__(
+        self,
+        url: Optional[str],
+        api_key: Optional[str],
+        collection_name: str,
+        dim: int,
+        profile=QDRANT_PROFILE,
+    ):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+
+        self.models = models
+        self.collection_name = collection_name
+        self.dim = dim
+        if isinstance(profile, str):
+            if profile not in QDRANT_PROFILES:
+                raise ValueError(f"Unknown Qdrant profile: {profile} (expected one of {', '.join(QDRANT_PROFILES)})")
+            profile = QDRANT_PROFILES[profile]
+        self.profile = profile
+        self._search_params = profile.search_params(models)
+        if url == ":memory:":
+            self.client = QdrantClient(location=":memory:")
+        else:
+            self.client = QdrantClient(url=url, api_key=api_key, timeout=60)
+
+    def ensure_collection(self) -> None:
+        if self.client.collection_exists(self.collection_name):
+            return
+        models = self.models
+        profile = self.profile
+        self.client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=models.VectorParams(
+                size=self.dim,
+                distance=models.Distance.COSINE,
+                on_disk=profile.on_disk_vectors,
+            ),
+            hnsw_config=models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct),
+            quantization_config=profile.quantization_config(models),
+            on_disk_payload=profile.on_disk_payload,
+        )
+        self._create_doc_index()
+
+    def _create_doc_index(self) -> None:
+        # Every query filters by doc_id; marking it as the tenant key lets
+        # Qdrant keep each document's points together.
+        self.client.create_payload_index(
+            collection_name=self.collection_name,
+            field_name="doc_id",
+            field_schema=self.models.KeywordIndexParams(type=self.models.KeywordIndexType.KEYWORD, is_tenant=True),
+        )
+
+    def apply_profile(self) -> List[str]:
+        """Moves an existing collection to this index's profile in place.
+
+        Qdrant rebuilds the HNSW graph or quantized vectors in the background
+        where needed; search keeps working meanwhile. Returns what changed.
+        """
+        models = self.models
+        profile = self.profile
+        config = self.client.get_collection(self.collection_name).config
+        changes = []
+
+        vectors = config.params.vectors
+        if bool(vectors.on_disk) != profile.on_disk_vectors:
+            changes.append(f"on_disk vectors: {bool(vectors.on_disk)} -> {profile.on_disk_vectors}")
+        hnsw = vectors.hnsw_config or config.hnsw_config
+        if (hnsw.m, hnsw.ef_construct) != (profile.hnsw_m, profile.hnsw_ef_construct):
+            changes.append(f"hnsw m/ef_construct: {hnsw.m}/{hnsw.ef_construct} -> "
+                           f"{profile.hnsw_m}/{profile.hnsw_ef_construct}")
+        current = vectors.quantization_config or config.quantization_config
+        current_kind = (
+            "scalar" if isinstance(current, models.ScalarQuantization)
+            else "binary" if isinstance(current, models.BinaryQuantization)
+            else None if current is None
+            else type(current).__name__
+        )
+        if current_kind != profile.quantization:
+            changes.append(f"quantization: {current_kind} -> {profile.quantization}")
+        if bool(config.params.on_disk_payload) != profile.on_disk_payload:
+            changes.append(f"on_disk payload: {bool(config.params.on_disk_payload)} -> {profile.on_disk_payload}")
+        if not changes:
+            return changes
+
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            vectors_config={"": models.VectorParamsDiff(on_disk=profile.on_disk_vectors)},
+            hnsw_config=models.HnswConfigDiff(m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct),
+            quantization_config=profile.quantization_config(models) or models.Disabled.DISABLED,
+            collection_params=models.CollectionParamsDiff(on_disk_payload=profile.on_disk_payload),
+        )
+        self._create_doc_index()
+        return changes
+
+    def _doc_filter(self, doc_id: Optional[str]):
+        if not doc_id:
+            return None
+        models = self.models
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="doc_id",
+                    match=models.MatchValue(value=doc_id),
+                )
+            ]
+        )
+
+    def stored_ids(self, doc_id: str) -> Set[str]:
+        point_ids = set()
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._doc_filter(doc_id),
+                limit=1000,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            point_ids.update(str(point.id) for point in points)
+            if offset is None:
+                return point_ids
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        # upload_collection accepts the NumPy array as-is, no per-float list conversion.
+        self.client.upload_collection(
+            collection_name=self.collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=max(1, len(ids)),
+            wait=True,
+        )
+
+    def delete(self, ids: List[str]) -> None:
+        for i in range(0, len(ids), 1000):
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=self.models.PointIdsList(points=ids[i : i + 1000]),
+            )
+
+    def search(self, vector: np.ndarray, doc_id: Optional[str], top_k: int) -> List[SearchHit]:
+        points = self.client.query_points(
+            collection_name=self.collection_name,
+            query=np.asarray(vector, dtype=np.float32).tolist(),
+            query_filter=self._doc_filter(doc_id),
+            search_params=self._search_params,
+            limit=top_k,
+            with_payload=True,
+        ).points
+        return [SearchHit(str(p.id), p.score, p.payload) for p in points]
+
+    def search_many(
+        self,
+        vectors: np.ndarray,
+        doc_id: Optional[str],
+        top_k: int,
+    ) -> List[List[SearchHit]]:
+        query_filter = self._doc_filter(doc_id)
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                self.models.QueryRequest(
+                    query=vector,
+                    filter=query_filter,
+                    params=self._search_params,
+                    limit=top_k,
+                    with_payload=True,
+                )
+                for vector in np.asarray(vectors, dtype=np.float32).tolist()
+            ],
+        )
+        return [
+            [SearchHit(str(p.id), p.score, p.payload) for p in response.points]
+            for response in responses
+        ]
+
+    def flush(self) -> None:
+        pass
+
+
+class LocalVectorIndex:
+    """In-process brute-force cosine index.
+
+    Normalised float32 vectors live in a memory-mapped matrix that doubles in
+    capacity as it fills; ids and payloads go to a JSON-lines sidecar. Search
+    by ``doc_id`` scores only that document's rows via a precomputed row index.
+    """
+
+    def __init__(self, path: str, dim: int, initial_capacity: int = 1024):
+        self.path = path
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._vectors_path = os.path.join(path, "vectors.bin")
+        self._payloads_path = os.path.join(path, "payloads.jsonl")
+        self._meta_path = os.path.join(path, "meta.json")
+        self._initial_capacity = initial_capacity
+
+    def ensure_collection(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        self.ids: List[Optional[str]] = []
+        self.payloads: List[Optional[Dict[str, Any]]] = []
+        self.row_of: Dict[str, int] = {}
+        self.free_rows: List[int] = []
+        self._doc_rows: Dict[str, Set[int]] = {}
+        self._doc_row_arrays: Dict[str, np.ndarray] = {}
+
+        capacity = self._initial_capacity
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != self.dim:
+                raise ValueError(
+                    f"Local index at {self.path} has dim {meta['dim']}, expected {self.dim}"
+                )
+            capacity = meta["capacity"]
+            rows = meta["rows"]
+            self.ids = [None] * rows
+            self.payloads = [None] * rows
+            with open(self._payloads_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    self._assign(record["row"], record["id"], record["payload"])
+            self.free_rows = [row for row in range(rows) if self.ids[row] is None]
+            mode = "r+"
+        else:
+            mode = "w+"
+
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim)
+        )
+        self.alive = np.zeros(capacity, dtype=bool)
+        for row in self.row_of.values():
+            self.alive[row] = True
+
+    def _assign(self, row: int, point_id: str, payload: Dict[str, Any]) -> None:
+        self.ids[row] = point_id
+        self.payloads[row] = payload
+        self.row_of[point_id] = row
+        doc_id = payload.get("doc_id")
+        self._doc_rows.setdefault(doc_id, set()).add(row)
+        self._doc_row_arrays.pop(doc_id, None)
+
+    def _unindex_doc(self, row: int) -> None:
+        doc_id = self.payloads[row].get("doc_id")
+        self._doc_rows.get(doc_id, set()).discard(row)
+        self._doc_row_arrays.pop(doc_id, None)
+
+    def _release(self, row: int) -> None:
+        self._unindex_doc(row)
+        del self.row_of[self.ids[row]]
+        self.ids[row] = None
+        self.payloads[row] = None
+        self.alive[row] = False
+        self.free_rows.append(row)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.vectors.flush()
+        del self.vectors
+        with open(self._vectors_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self.alive.shape[0]] = self.alive
+        self.alive = alive
+
+    def _doc_row_array(self, doc_id: str) -> np.ndarray:
+        rows = self._doc_row_arrays.get(doc_id)
+        if rows is None:
+            rows = np.fromiter(sorted(self._doc_rows.get(doc_id, ())), dtype=np.int64)
+            self._doc_row_arrays[doc_id] = rows
+        return rows
+
+    def stored_ids(self, doc_id: str) -> Set[str]:
+        with self._lock:
+            return {self.ids[row] for row in self._doc_rows.get(doc_id, ())}
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            for point_id, vector, payload in zip(ids, vectors, payloads):
+                row = self.row_of.get(point_id)
+                if row is not None:
+                    self._unindex_doc(row)
+                elif self.free_rows:
+                    row = self.free_rows.pop()
+                else:
+                    row = len(self.ids)
+                    self.ids.append(None)
+                    self.payloads.append(None)
+                    self._grow(row + 1)
+                self.vectors[row] = vector
+                self.alive[row] = True
+                self._assign(row, point_id, payload)
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            for point_id in ids:
+                row = self.row_of.get(point_id)
+                if row is not None:
+                    self._release(row)
+
+    def search(self, vector: np.ndarray, doc_id: Optional[str], top_k: int) -> List[SearchHit]:
+        return self.search_many(np.asarray(vector)[None, :], doc_id, top_k)[0]
+
+    def search_many(
+        self,
+        vectors: np.ndarray,
+        doc_id: Optional[str],
+        top_k: int,
+    ) -> List[List[SearchHit]]:
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            if doc_id:
+                rows = self._doc_row_array(doc_id)
+                scores = queries @ self.vectors[rows].T if rows.size else None
+            else:
+                rows = np.arange(len(self.ids))
+                scores = queries @ self.vectors[: rows.size].T if rows.size else None
+                if scores is not None:
+                    scores[:, ~self.alive[: rows.size]] = -np.inf
+            live = int(rows.size if doc_id else self.alive[: rows.size].sum())
+            if scores is None or live == 0:
+                return [[] for _ in range(len(queries))]
+
+            k = min(top_k, live)
+            results = []
+            for row_scores in scores:
+                top = np.argpartition(-row_scores, k - 1)[:k]
+                top = top[np.argsort(-row_scores[top])]
+                results.append(
+                    [
+                        SearchHit(self.ids[rows[i]], float(row_scores[i]), self.payloads[rows[i]])
+                        for i in top
+                    ]
+                )
+            return results
+
+    def flush(self) -> None:
+        with self._lock:
+            self.vectors.flush()
+            tmp_path = f"{self._payloads_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for row, point_id in enumerate(self.ids):
+                    if point_id is not None:
+                        f.write(
+                            json.dumps(
+                                {"row": row, "id": point_id, "payload": self.payloads[row]},
+                                ensure_ascii=False,
+                            )
+                            + "\n"
+                        )
+            os.replace(tmp_path, self._payloads_path)
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"dim": self.dim, "rows": len(self.ids), "capacity": self.vectors.shape[0]},
+                    f,
+                )
@@ -1,52 +1,182 @@
+import argparse
 import time
+from typing import Tuple
+
 from utils.file_writer import FileWriter
 from utils.youtube_utils import YouTubeURLParser
 from services.transcript_service import TranscriptService
 from services.langchain_notes_service import LangChainNotesService
-from domain.prompt_builder import PromptBuilder
 
 from integrations.notion_mcp_client import NotionMCPClient
+from integrations.notion_sync import NotionPageSync
 from integrations.rag_implementation import MarkdownVectorStore
-from config.settings import QDRANT_API_KEY, QDRANT_URL, COLLECTION_NAME
-
-
-def main():
-    url = input("Enter the YouTube video URL: ").strip()
+from services.batch_pipeline import VideoJob, build_video_pipeline
+from services.ingest_dag import build_ingest_dag
+from services.openrouter_client import get_default_client
+from services.playlist_service import PlaylistService
+from utils.stage_dag import StageDAG
+from utils.tracing import traced, tracer
+from utils.startup_profile import StartupProfiler
+from config.settings import (
+    QDRANT_API_KEY, QDRANT_URL, COLLECTION_NAME, NOTION_PARENT_PAGE_ID, SERVER_HOST, SERVER_PORT,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="YouTube -> AI notes -> Notion -> RAG chat")
+    parser.add_argument("urls", nargs="*", help="video or playlist URLs to ingest in batch mode")
+    parser.add_argument("--urls-file", help="file with one video or playlist URL per line")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="run the HTTP API with a warm model, an ingest job queue and RAG queries",
+    )
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument(
+        "--apply-qdrant-profile",
+        action="store_true",
+        help="migrate the existing Qdrant collection to QDRANT_PROFILE and exit",
+    )
+    parser.add_argument(
+        "--startup-report",
+        action="store_true",
+        help="print a per-module import time breakdown and exit",
+    )
+    return parser.parse_args()
+
+
+def collect_video_ids(urls: list[str]) -> list[str]:
+    playlists = PlaylistService()
+    video_ids = []
+    for url in urls:
+        video_id = YouTubeURLParser.extract_video_id(url)
+        playlist_id = YouTubeURLParser.extract_playlist_id(url)
+        if video_id:
+            video_ids.append(video_id)
+        elif playlist_id:
+            video_ids.extend(playlists.get_video_ids(playlist_id))
+        else:
+            raise ValueError(f"No video or playlist id in URL: {url}")
+    return list(dict.fromkeys(video_ids))
+
+
+def apply_qdrant_profile():
+    from integrations.vector_index import QdrantIndex
+
+    if not QDRANT_URL:
+        raise SystemExit("QDRANT_URL is not set")
+    # The vector size is only needed when the collection is created.
+    index = QdrantIndex(QDRANT_URL, QDRANT_API_KEY, COLLECTION_NAME, dim=0)
+    changes = index.apply_profile()
+    if not changes:
+        print(f"{COLLECTION_NAME} already matches the {index.profile.name} profile")
+        return
+    print(f"Moving {COLLECTION_NAME} to the {index.profile.name} profile; Qdrant re-indexes in the background:")
+    for change in changes:
+        print(f"  {change}")
+
+
+def run_batch(urls: list[str]):
+    video_ids = collect_video_ids(urls)
+    print(f"Batch ingesting {len(video_ids)} videos")
+
+    pipeline = build_video_pipeline(
+        transcript_service=TranscriptService(),
+        notes_service=LangChainNotesService(),
+        notion_client=NotionPageSync() if NOTION_PARENT_PAGE_ID else NotionMCPClient(),
+        vector_store=MarkdownVectorStore(
+            qdrant_url=QDRANT_URL,
+            qdrant_api_key=QDRANT_API_KEY,
+            collection_name=COLLECTION_NAME,
+            warm_up_in_background=True,
+        ),
+    )
+    with tracer.span("batch", videos=len(video_ids)):
+        jobs = pipeline.run(VideoJob(video_id) for video_id in video_ids)
+    print(pipeline.format_summary(jobs))
+    print(get_default_client().format_stats())
+    trace_path = tracer.export()
+    if trace_path:
+        print(f"Trace written to {trace_path}")
+
+
+@traced("ingest")
+def ingest(url: str, vector_store: MarkdownVectorStore) -> Tuple[str, StageDAG]:
+    """Runs one video through the ingest stages and returns once its notes
+    are indexed; Notion publishing may still be running on the returned DAG."""
     start = time.time()
-
+    tracer.current().set(url=url)
     video_id = YouTubeURLParser.extract_video_id(url)
 
-    transcript_service = TranscriptService()
-    transcript = transcript_service.get_transcript(video_id)
-
     notes_service = LangChainNotesService()
-    prompt = PromptBuilder.build(transcript)
-    notes = notes_service.generate_notes(prompt)
-
-    FileWriter.write("output/captions.txt", transcript)
-    FileWriter.write("output/ai_notes.md", notes)
 
-    notion_client = NotionMCPClient()
+    def fetch_transcript():
+        transcript_service = TranscriptService()
+        transcript = transcript_service.get_transcript(video_id)
+        if transcript_service.compactor is not None:
+            print(transcript_service.format_compaction(video_id))
+        return transcript
+
+    def stream_notes(transcript):
+        # The notes service wraps every chunk in PromptBuilder itself.
+        FileWriter.write("output/ai_notes.md", "")
+        first = True
+        for section in notes_service.stream_notes(transcript):
+            FileWriter.append("output/ai_notes.md", ("" if first else "\n\n") + section)
+            first = False
+            yield section
+        print(notes_service.format_report())
+        print(notes_service.ai_service.client.format_stats())
+
+    def write_files(transcript):
+        FileWriter.write("output/captions.txt", transcript)
+
+    def publish_notion(notes):
+        if NOTION_PARENT_PAGE_ID:
+            # Re-running on the same video only patches the blocks that changed.
+            page = NotionPageSync().publish(video_id, "Notes", notes)
+            print(f"✅ Notes synced to Notion ({page['skipped']} unchanged, "
+                  f"{page['updated']} updated, {page['created']} created, "
+                  f"{page['archived']} archived blocks)")
+            return page
+
+        NotionMCPClient().publish(video_id, "Notes", notes)
+        print(f"✅ Notes stored in Notion")
+
+    def index_sections(sections):
+        return vector_store.ingest_sections(sections, doc_id=video_id)
+
+    # Indexing consumes note sections while later ones are still being
+    # generated; Notion publishing waits for the finished notes.
+    dag = build_ingest_dag(fetch_transcript, stream_notes, index_sections, write_files, publish_notion)
+    dag.start()
+
+    ingest_result = dag.result("index")
+    doc_id = ingest_result["doc_id"]
+    if "embedding_cache" in ingest_result:
+        cache_stats = ingest_result["embedding_cache"]
+        print(f"Embedding cache hit ratio: {cache_stats['hit_ratio']:.0%} "
+              f"({cache_stats['hits']} hits, {cache_stats['misses']} misses)")
 
-    notion_prompt = f"""
-    Create a Notion page titled "Notes"
-    and add the following markdown content as paragraphs:
+    print(f"✅ Notes indexed in Qdrant (doc_id={doc_id}, "
+          f"{ingest_result['chunks_stored']} points at {ingest_result['points_per_sec']:.0f} points/s)")
+    print(f"Ready for questions after {time.time() - start:.1f}s")
+    return doc_id, dag
 
-{notes}
-"""
-    notion_client.run(notion_prompt)
 
+def main():
+    # The embedding model and index connection warm up while we wait for the
+    # URL, fetch the transcript and wait on the LLM.
     vector_store = MarkdownVectorStore(
         qdrant_url=QDRANT_URL,
         qdrant_api_key=QDRANT_API_KEY,
         collection_name=COLLECTION_NAME,
+        warm_up_in_background=True,
     )
 
-    ingest_result = vector_store.ingest_markdown("output/ai_notes.md")
-    doc_id = ingest_result["doc_id"]
-
-    print(f"✅ Notes stored in Notion")
-    print(f"✅ Notes indexed in Qdrant (doc_id={doc_id})")
+    url = input("Enter the YouTube video URL: ").strip()
+    doc_id, dag = ingest(url, vector_store)
 
     print("RAG chat started. Type 'exit' to quit.\n")
 
@@ -63,5 +193,41 @@ def main():
         print("Context-based answer:")
         print(result["context"])
 
+    if vector_store.query_cache is not None:
+        print(vector_store.query_cache.format_stats())
+    for stage, error in dag.wait().items():
+        print(f"❌ Stage {stage} failed: {error}")
+    print(dag.format_timings())
+    trace_path = tracer.export()
+    if trace_path:
+        print(f"Trace written to {trace_path}")
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.startup_report:
+        print(StartupProfiler.report())
+        raise SystemExit(0)
+
+    if args.apply_qdrant_profile:
+        apply_qdrant_profile()
+        raise SystemExit(0)
+
+    if args.serve:
+        from services.notes_server import NotesServer
+
+        NotesServer().serve(args.host, args.port)
+        raise SystemExit(0)
+
+    urls = list(args.urls)
+    if args.urls_file:
+        with open(args.urls_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    urls.append(line)
+
+    if urls:
+        run_batch(urls)
+    else:
+        main()
+
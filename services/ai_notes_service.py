@@ -1,32 +1,114 @@
-from config.settings import OPENROUTER_API_KEY, OPENROUTER_MODEL, OPENROUTER_URL, APP_TITLE, APP_REFERER
-import requests
+import json
+import time
+from typing import Dict, Iterator, Optional
+
+from config.settings import NOTES_MAX_OUTPUT_TOKENS, OPENROUTER_MODEL
+from domain.prompt_builder import PromptBuilder
+from services.llm_cache import get_default_cache
+from services.openrouter_client import OpenRouterClient, get_default_client
+from utils.tracing import tracer
+
 
 class AINotesService:
-    def __init__(self):
-        if not OPENROUTER_API_KEY:
-            raise RuntimeError("Set OPENROUTER_API_KEY in environment variables")
-        self.headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": APP_REFERER,
-            "X-Title": APP_TITLE,
-        }
+    def __init__(self, use_cache: bool = True, client: Optional[OpenRouterClient] = None):
+        self.client = client or get_default_client()
+        self.cache = get_default_cache() if use_cache else None
+
+    def _cache_key(self, prompt: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        return self.cache.make_key("notes", OPENROUTER_MODEL, NOTES_MAX_OUTPUT_TOKENS, PromptBuilder.VERSION, prompt)
 
     def generate_notes(self, prompt: str) -> str:
-        response = requests.post(
-            url=OPENROUTER_URL,
-            headers=self.headers,
-            json={
+        cache_key = self._cache_key(prompt)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            tracer.current().set(llm_cache="hit" if cached is not None else "miss")
+            if cached is not None:
+                return cached
+
+        result = self.client.chat(
+            {
                 "model": OPENROUTER_MODEL,
                 "messages": [
                     {"role": "user", "content": prompt}
                 ],
+                "max_tokens": NOTES_MAX_OUTPUT_TOKENS,
             }
         )
+        content = result["choices"][0]["message"]["content"]
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
 
-        if response.status_code != 200:
-            raise RuntimeError(
-                f"OpenRouter API error {response.status_code}: {response.text}"
-            )
+    def stream_notes(self, prompt: str, stats: Optional[Dict] = None) -> Iterator[str]:
+        """Yields the completion as it is generated (OpenRouter SSE stream).
+
+        If ``stats`` is given it is filled with time-to-first-token, token
+        count and tokens/sec once the stream ends. A cache hit yields the
+        whole cached text at once.
+        """
+        start = time.perf_counter()
+        cache_key = self._cache_key(prompt)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            tracer.current().set(llm_cache="hit" if cached is not None else "miss")
+            if cached is not None:
+                if stats is not None:
+                    stats.update(ttft=0.0, tokens=0, tokens_per_sec=0.0, cached=True)
+                yield cached
+                return
 
-        return response.json()["choices"][0]["message"]["content"]
\ No newline at end of file
+        response = self.client.stream_chat(
+            {
+                "model": OPENROUTER_MODEL,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "max_tokens": NOTES_MAX_OUTPUT_TOKENS,
+            }
+        )
+
+        parts = []
+        first_token_at = None
+        tokens = 0
+        usage = None
+        with response:
+            # chunk_size=None hands over data as it arrives instead of
+            # buffering 512 bytes, which would delay every token.
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                # Blank lines separate events; lines starting with ":" are
+                # keep-alive comments OpenRouter sends while the model queues.
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise RuntimeError(f"OpenRouter stream error: {event['error']}")
+                usage = event.get("usage") or usage
+                for choice in event.get("choices", []):
+                    token = (choice.get("delta") or {}).get("content")
+                    if not token:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    tokens += 1
+                    parts.append(token)
+                    yield token
+
+        end = time.perf_counter()
+        self.client.record_usage(usage)
+        if usage and usage.get("completion_tokens"):
+            tokens = usage["completion_tokens"]
+        if stats is not None:
+            generation_time = end - (first_token_at or end)
+            stats.update(
+                ttft=(first_token_at or end) - start,
+                tokens=tokens,
+                tokens_per_sec=tokens / generation_time if generation_time else 0.0,
+                cached=False,
+            )
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
@@ -0,0 +1,211 @@
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config.settings import (
+    BATCH_INDEX_WORKERS,
+    BATCH_NOTES_WORKERS,
+    BATCH_NOTION_WORKERS,
+    BATCH_QUEUE_SIZE,
+    BATCH_TRANSCRIPT_WORKERS,
+)
+from utils.file_writer import FileWriter
+from utils.tracing import propagate, tracer
+
+_STOP = object()
+
+
+class VideoJob:
+    def __init__(self, video_id: str):
+        self.video_id = video_id
+        self.transcript: Optional[str] = None
+        self.notes: Optional[str] = None
+        self.notes_path: Optional[str] = None
+        self.doc_id: Optional[str] = None
+        self.error: Optional[str] = None
+        self.failed_stage: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class PipelineStage:
+    def __init__(self, name: str, handler: Callable[[VideoJob], None], workers: int = 1):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+
+
+class BatchPipeline:
+    """Runs jobs through stages connected by bounded queues.
+
+    Every stage has its own worker pool, so a slow stage only applies
+    backpressure to the one before it while later stages keep draining.
+    A job that fails in one stage is passed through the rest untouched.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = BATCH_QUEUE_SIZE):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.wall_time = 0.0
+        # Caps concurrent jobs per stage for run_one, like the pools in run.
+        self._stage_slots = {stage.name: threading.BoundedSemaphore(stage.workers) for stage in stages}
+
+    def run(self, jobs: Iterable[VideoJob]) -> List[VideoJob]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        done: "queue.Queue[VideoJob]" = queue.Queue()
+        threads = []
+
+        for index, stage in enumerate(self.stages):
+            out_queue = queues[index + 1] if index + 1 < len(self.stages) else done
+            next_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 0
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                thread = threading.Thread(
+                    target=propagate(self._worker),
+                    args=(stage, queues[index], out_queue, next_workers, remaining, lock),
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        start = time.perf_counter()
+        submitted = []
+        for job in jobs:
+            submitted.append(job)
+            queues[0].put(job)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+        self.wall_time = time.perf_counter() - start
+        return submitted
+
+    def _worker(self, stage, in_queue, out_queue, next_workers, remaining, lock):
+        while True:
+            job = in_queue.get()
+            if job is _STOP:
+                break
+            if job.ok:
+                self._run_stage(stage, job)
+            out_queue.put(job)
+
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                out_queue.put(_STOP)
+
+    def run_one(self, job: VideoJob, on_stage: Optional[Callable[[str], None]] = None) -> VideoJob:
+        """Runs a single job through all stages on the calling thread.
+
+        Used by long-running servers where jobs arrive one at a time; each
+        stage still admits at most `workers` jobs at once.
+        """
+        for stage in self.stages:
+            if not job.ok:
+                break
+            if on_stage is not None:
+                on_stage(stage.name)
+            with self._stage_slots[stage.name]:
+                self._run_stage(stage, job)
+        return job
+
+    @staticmethod
+    def _run_stage(stage: PipelineStage, job: VideoJob) -> None:
+        stage_start = time.perf_counter()
+        try:
+            with tracer.span(f"stage.{stage.name}", video_id=job.video_id):
+                stage.handler(job)
+        except Exception as e:
+            job.error = str(e)
+            job.failed_stage = stage.name
+        job.timings[stage.name] = time.perf_counter() - stage_start
+
+    def summary(self, jobs: List[VideoJob]) -> Dict:
+        stages = {}
+        for stage in self.stages:
+            durations = sorted(
+                job.timings[stage.name] for job in jobs if stage.name in job.timings
+            )
+            failed = sum(1 for job in jobs if job.failed_stage == stage.name)
+            stages[stage.name] = {
+                "workers": stage.workers,
+                "processed": len(durations),
+                "failed": failed,
+                "total": sum(durations),
+                "avg": sum(durations) / len(durations) if durations else 0.0,
+                "p50": durations[len(durations) // 2] if durations else 0.0,
+                "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))] if durations else 0.0,
+                "max": durations[-1] if durations else 0.0,
+            }
+        succeeded = sum(1 for job in jobs if job.ok)
+        return {
+            "videos": len(jobs),
+            "succeeded": succeeded,
+            "failed": len(jobs) - succeeded,
+            "wall_time": self.wall_time,
+            "videos_per_hour": succeeded * 3600 / self.wall_time if self.wall_time else 0.0,
+            "stages": stages,
+        }
+
+    def format_summary(self, jobs: List[VideoJob]) -> str:
+        summary = self.summary(jobs)
+        lines = [
+            f"{summary['succeeded']}/{summary['videos']} videos ingested in "
+            f"{summary['wall_time']:.1f}s ({summary['videos_per_hour']:.0f} videos/hour)",
+        ]
+        for name, s in summary["stages"].items():
+            lines.append(
+                f"  {name:<10} workers={s['workers']}  processed={s['processed']}  "
+                f"failed={s['failed']}  avg={s['avg']:.2f}s  max={s['max']:.2f}s"
+            )
+        for job in jobs:
+            if not job.ok:
+                lines.append(f"  ✗ {job.video_id} failed in {job.failed_stage}: {job.error}")
+        return "\n".join(lines)
+
+
+def build_video_pipeline(
+    transcript_service,
+    notes_service,
+    notion_client,
+    vector_store,
+    output_dir: str = "output",
+) -> BatchPipeline:
+    def fetch_transcript(job: VideoJob) -> None:
+        job.transcript = transcript_service.get_transcript(job.video_id)
+        FileWriter.write(os.path.join(output_dir, job.video_id, "captions.txt"), job.transcript)
+
+    def generate_notes(job: VideoJob) -> None:
+        job.notes = notes_service.generate_notes(job.transcript)
+        job.notes_path = os.path.join(output_dir, job.video_id, "ai_notes.md")
+        FileWriter.write(job.notes_path, job.notes)
+
+    def publish_notion(job: VideoJob) -> None:
+        notion_client.publish(job.video_id, f"Notes ({job.video_id})", job.notes)
+
+    def index_notes(job: VideoJob) -> None:
+        result = vector_store.ingest_markdown(
+            job.notes_path,
+            doc_id=job.video_id,
+            incremental=True,
+            streaming=True,
+        )
+        job.doc_id = result["doc_id"]
+
+    return BatchPipeline(
+        [
+            PipelineStage("transcript", fetch_transcript, BATCH_TRANSCRIPT_WORKERS),
+            PipelineStage("notes", generate_notes, BATCH_NOTES_WORKERS),
+            PipelineStage("notion", publish_notion, BATCH_NOTION_WORKERS),
+            PipelineStage("index", index_notes, BATCH_INDEX_WORKERS),
+        ]
+    )
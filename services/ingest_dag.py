@@ -0,0 +1,56 @@
+import queue
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+from utils.stage_dag import StageDAG
+
+
+def build_ingest_dag(
+    fetch_transcript: Callable[[], str],
+    stream_notes: Callable[[str], Iterable[str]],
+    index_sections: Callable[[Iterator[str]], Dict[str, Any]],
+    write_captions: Callable[[str], None],
+    publish: Callable[[str], Any],
+) -> StageDAG:
+    """Stages of a single-video ingest, not yet started.
+
+    Note sections are handed to `index_sections` through a queue as
+    `stream_notes` yields them, so indexing overlaps generation; `publish`
+    gets the finished notes. The result of the "index" stage is whatever
+    `index_sections` returns; captions and Notion run in the background.
+    """
+    # None marks the end of the notes, an exception aborts the ingest.
+    sections: "queue.Queue" = queue.Queue()
+
+    def generate_notes(transcript: str) -> str:
+        parts = []
+        try:
+            for section in stream_notes(transcript):
+                parts.append(section)
+                sections.put(section)
+        except BaseException as e:
+            sections.put(e)
+            raise
+        sections.put(None)
+        return "\n\n".join(parts)
+
+    def completed_sections() -> Iterator[str]:
+        while True:
+            section = sections.get()
+            if section is None:
+                return
+            if isinstance(section, BaseException):
+                raise RuntimeError("Note generation failed") from section
+            yield section
+
+    def index_notes(transcript: str) -> Dict[str, Any]:
+        # Waiting on the transcript means a failed fetch fails this stage
+        # directly; once it succeeds, generate_notes always ends the queue.
+        return index_sections(completed_sections())
+
+    dag = StageDAG()
+    dag.add("transcript", fetch_transcript)
+    dag.add("notes", generate_notes, depends_on=["transcript"])
+    dag.add("write_files", lambda transcript: write_captions(transcript), depends_on=["transcript"], background=True)
+    dag.add("notion", lambda notes: publish(notes), depends_on=["notes"], background=True)
+    dag.add("index", index_notes, depends_on=["transcript"])
+    return dag
@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from services.batch_pipeline import BatchPipeline, VideoJob
+from utils.tracing import metrics, tracer
+
+_STOP = object()
+
+
+class JobQueueFullError(RuntimeError):
+    pass
+
+
+class IngestJob:
+    def __init__(self, video_id: str):
+        self.id = uuid.uuid4().hex
+        self.video = VideoJob(video_id)
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "video_id": self.video.video_id,
+            "status": self.status,
+            "stage": self.stage,
+            "doc_id": self.video.doc_id,
+            "error": self.video.error,
+            "failed_stage": self.video.failed_stage,
+            "timings": self.video.timings,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestJobQueue:
+    """Bounded queue of ingest jobs worked off by a fixed pool of threads.
+
+    Each job runs through the pipeline's stages with `BatchPipeline.run_one`.
+    A submit for a video that is already queued or running returns that job,
+    and only the `history` most recent jobs are kept for status lookups.
+    """
+
+    def __init__(self, pipeline: BatchPipeline, workers: int = 2, queue_size: int = 32, history: int = 1000):
+        self.pipeline = pipeline
+        self.history = history
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+        self._active: Dict[str, IngestJob] = {}
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"ingest-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, video_id: str) -> IngestJob:
+        with self._lock:
+            active = self._active.get(video_id)
+            if active is not None:
+                return active
+            job = IngestJob(video_id)
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                metrics.inc("ingest_jobs_rejected_total")
+                raise JobQueueFullError(f"Ingest queue is full ({self._queue.maxsize} jobs waiting)")
+            self._active[video_id] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.finished:
+                    break
+                del self._jobs[oldest_id]
+        metrics.inc("ingest_jobs_total", status="queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[IngestJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queued": self._queue.qsize(), "capacity": self._queue.maxsize, "statuses": counts}
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[IngestJob]:
+        job = self.get(job_id)
+        if job is not None:
+            job._done.wait(timeout)
+        return job
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            job.status = "running"
+            job.started_at = time.time()
+            with tracer.span("ingest.job", video_id=job.video.video_id, job_id=job.id):
+                self.pipeline.run_one(job.video, on_stage=lambda stage: setattr(job, "stage", stage))
+            job.finished_at = time.time()
+            job.status = "done" if job.video.ok else "failed"
+            metrics.inc("ingest_jobs_total", status=job.status)
+            metrics.observe("ingest_job_seconds", job.finished_at - job.started_at)
+            with self._lock:
+                self._active.pop(job.video.video_id, None)
+            job._done.set()
@@ -1,24 +1,196 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
 from services.ai_notes_service import AINotesService
+from services.openrouter_client import CircuitOpenError
 from domain.prompt_builder import PromptBuilder
+from config.settings import NOTES_MAX_CONCURRENCY, NOTES_TOKEN_PACKING
+from utils.concurrency import AdaptiveConcurrencyLimiter
+from utils.tracing import propagate, traced_iter, tracer
+
 
 class LangChainNotesService:
-    def __init__(self):
-        self.ai_service = AINotesService()
+    def __init__(
+        self,
+        max_concurrency: int = NOTES_MAX_CONCURRENCY,
+        token_packing: bool = NOTES_TOKEN_PACKING,
+        ai_service: Optional[AINotesService] = None,
+        packer=None,
+    ):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+        from services.token_packer import TranscriptPacker
+
+        self.ai_service = ai_service or AINotesService()
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=3500,
             chunk_overlap=200
         )
-    
+        # The packer fills each request up to the model's context budget; the
+        # character splitter is kept as the baseline it is reported against.
+        self.packer = (packer or TranscriptPacker()) if token_packing else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.last_report: Optional[Dict] = None
+
     def generate_notes(self, transcript: str) -> str:
-        
-        chunks = self.text_splitter.split_text(transcript)
-        chunk_notes = []
-        for chunk in chunks:
-            prompt = PromptBuilder.build(chunk)
-            note = self.ai_service.generate_notes(prompt)
-            chunk_notes.append(note)
+        with tracer.span("notes.generate", stream=False):
+            chunk_notes = list(self._run(transcript, stream=False))
         final_notes = self._merge_notes(chunk_notes)
         return final_notes
+
+    def stream_notes(self, transcript: str) -> Iterator[str]:
+        """Yields each chunk's notes, in transcript order, as soon as it and
+        every chunk before it are complete. Completions are streamed from
+        OpenRouter so per-call time-to-first-token lands in the report."""
+        return traced_iter("notes.generate", self._run(transcript, stream=True), stream=True)
+
+    def _split(self, transcript: str):
+        baseline = self.text_splitter.split_text(transcript)
+        if self.packer is None:
+            return baseline, None
+        chunks = self.packer.pack(transcript)
+        packing = {
+            "tokenizer": self.packer.counter.source,
+            "budget": self.packer.budget,
+            "calls": len(chunks),
+            "prompt_tokens": self.packer.prompt_tokens(chunks),
+            "baseline_calls": len(baseline),
+            "baseline_prompt_tokens": self.packer.prompt_tokens(baseline),
+        }
+        return chunks, packing
+
+    def _run(self, transcript: str, stream: bool) -> Iterator[str]:
+        chunks, packing = self._split(transcript)
+        span = tracer.current()
+        span.set(chunks=len(chunks), transcript_chars=len(transcript))
+        if packing:
+            span.set(prompt_tokens=packing["prompt_tokens"], baseline_prompt_tokens=packing["baseline_prompt_tokens"])
+        limiter = AdaptiveConcurrencyLimiter(min(self.max_concurrency, max(1, len(chunks))))
+        timings: List[Dict] = [None] * len(chunks)
+
+        # The shared OpenRouter client retries 429s itself; it reports each
+        # one so the limiter can still shrink the number of parallel calls.
+        def on_rate_limited(retry_after):
+            limiter.on_rate_limited()
+
+        client = self.ai_service.client
+        client.add_rate_limit_listener(on_rate_limited)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=limiter.max_concurrency) as pool:
+                futures = [
+                    pool.submit(propagate(self._generate_chunk), index, chunk, limiter, timings, stream)
+                    for index, chunk in enumerate(chunks)
+                ]
+                # Yielded in submission order so the merged notes are deterministic.
+                for future in futures:
+                    yield future.result()
+        finally:
+            client.remove_rate_limit_listener(on_rate_limited)
+        elapsed = time.perf_counter() - start
+
+        self.last_report = self._build_report(timings, elapsed, limiter)
+        self.last_report["packing"] = packing
+        span.set(rate_limited=limiter.rate_limited, final_concurrency=limiter.limit)
+
+    def _generate_chunk(
+        self,
+        index: int,
+        chunk: str,
+        limiter: AdaptiveConcurrencyLimiter,
+        timings: List[Dict],
+        stream: bool = False,
+    ) -> str:
+        with tracer.span("notes.chunk", chunk=index, chars=len(chunk)) as span:
+            note = self._generate_chunk_once(index, chunk, limiter, timings, stream)
+            span.set(**{key: value for key, value in timings[index].items() if key != "chunk"})
+            return note
+
+    def _generate_chunk_once(self, index, chunk, limiter, timings, stream) -> str:
+        # Retries and backoff belong to the OpenRouter client; 429s reach the
+        # limiter through the rate-limit listener registered in _run.
+        prompt = PromptBuilder.build(chunk)
+        with limiter:
+            call_start = time.perf_counter()
+            stream_stats: Dict = {}
+            try:
+                if stream:
+                    note = "".join(self.ai_service.stream_notes(prompt, stream_stats))
+                else:
+                    note = self.ai_service.generate_notes(prompt)
+            except CircuitOpenError as e:
+                raise RuntimeError(
+                    f"Notes generation stopped at chunk {index}: {e}; "
+                    f"OpenRouter is retried after {self.ai_service.client.breaker.reset_timeout:g}s"
+                ) from e
+            limiter.on_success()
+            timings[index] = {
+                "chunk": index,
+                "chars": len(chunk),
+                "latency": time.perf_counter() - call_start,
+                **stream_stats,
+            }
+            return note
+
+    def _build_report(
+        self,
+        timings: List[Dict],
+        elapsed: float,
+        limiter: AdaptiveConcurrencyLimiter,
+    ) -> Dict:
+        latencies = sorted(t["latency"] for t in timings)
+        streamed = [t for t in timings if "ttft" in t and not t.get("cached")]
+        return {
+            "chunks": len(timings),
+            "wall_time": elapsed,
+            "chunks_per_sec": len(timings) / elapsed if elapsed else 0.0,
+            "latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_max": latencies[-1] if latencies else 0.0,
+            "max_concurrency": limiter.max_concurrency,
+            "final_concurrency": limiter.limit,
+            "rate_limited": limiter.rate_limited,
+            "ttft_avg": sum(t["ttft"] for t in streamed) / len(streamed) if streamed else None,
+            "tokens_per_sec_avg": (
+                sum(t["tokens_per_sec"] for t in streamed) / len(streamed) if streamed else None
+            ),
+            "per_chunk": timings,
+        }
+
+    def format_report(self) -> str:
+        report = self.last_report
+        if not report:
+            return "No notes generated yet."
+        lines = [
+            f"{report['chunks']} chunks in {report['wall_time']:.2f}s "
+            f"({report['chunks_per_sec']:.2f} chunks/s), "
+            f"concurrency {report['final_concurrency']}/{report['max_concurrency']}, "
+            f"{report['rate_limited']} rate-limited responses",
+        ]
+        packing = report.get("packing")
+        if packing:
+            lines.append(
+                f"  packing ({packing['tokenizer']}, {packing['budget']} tokens/request): "
+                f"{packing['calls']} calls / {packing['prompt_tokens']} prompt tokens vs "
+                f"{packing['baseline_calls']} calls / {packing['baseline_prompt_tokens']} "
+                f"with the 3500-char splitter"
+            )
+        if report["ttft_avg"] is not None:
+            lines.append(
+                f"  streaming: avg time-to-first-token {report['ttft_avg']:.2f}s, "
+                f"avg {report['tokens_per_sec_avg']:.1f} tokens/s"
+            )
+        for t in report["per_chunk"]:
+            line = (
+                f"  chunk {t['chunk']:>3}: {t['chars']:>5} chars  "
+                f"{t['latency']:.2f}s"
+            )
+            if "ttft" in t:
+                line += (
+                    " (cached)" if t["cached"]
+                    else f"  ttft={t['ttft']:.2f}s  {t['tokens_per_sec']:.1f} tok/s"
+                )
+            lines.append(line)
+        return "\n".join(lines)
+
     def _merge_notes(self, notes: list[str]) -> str:
-        return "\n\n".join(notes)
\ No newline at end of file
+        return "\n\n".join(notes)
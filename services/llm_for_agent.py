@@ -1,48 +1,41 @@
-import requests
-from config.settings import (
-    OPENROUTER_API_KEY,
-    OPENROUTER_MODEL,
-    OPENROUTER_URL,
-    APP_TITLE,
-    APP_REFERER,
-)
+from typing import Optional
 
+from config.settings import OPENROUTER_MODEL
+from services.llm_cache import get_default_cache
+from services.openrouter_client import OpenRouterClient, get_default_client
 
-class AIService:
-    def __init__(self):
-        if not OPENROUTER_API_KEY:
-            raise RuntimeError("Set OPENROUTER_API_KEY in environment variables")
 
-        self.headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": APP_REFERER,
-            "X-Title": APP_TITLE,
-        }
+class AIService:
+    def __init__(self, use_cache: bool = True, client: Optional[OpenRouterClient] = None):
+        self.client = client or get_default_client()
+        self.cache = get_default_cache() if use_cache else None
 
     def llm_with_tools(
         self,
         system_prompt: str,
         user_prompt: str,
         tools: list,
+        cache: bool = True,
     ):
-        response = requests.post(
-            url=OPENROUTER_URL,
-            headers=self.headers,
-            json={
-                "model": OPENROUTER_MODEL,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                "tools": tools,
-                "tool_choice": "auto",
-            },
-        )
+        payload = {
+            "model": OPENROUTER_MODEL,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "tools": tools,
+            "tool_choice": "auto",
+        }
 
-        if response.status_code != 200:
-            raise RuntimeError(
-                f"OpenRouter API error {response.status_code}: {response.text}"
-            )
+        # Pass cache=False for tool calls whose result must not be replayed.
+        cache_key = None
+        if cache and self.cache is not None:
+            cache_key = self.cache.make_key("tools", payload)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        return response.json()
+        result = self.client.chat(payload)
+        if cache_key is not None:
+            self.cache.set(cache_key, result)
+        return result
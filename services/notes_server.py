@@ -0,0 +1,173 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+from config.settings import (
+    COLLECTION_NAME,
+    NOTION_PARENT_PAGE_ID,
+    QDRANT_API_KEY,
+    QDRANT_URL,
+    SERVER_INGEST_WORKERS,
+    SERVER_JOB_QUEUE_SIZE,
+    SERVER_MAX_TOP_K,
+    SERVER_QUERY_BATCH_SIZE,
+    SERVER_QUERY_BATCH_WAIT_MS,
+    SERVER_QUERY_TIMEOUT,
+)
+from services.job_queue import IngestJobQueue, JobQueueFullError
+from utils.micro_batcher import MicroBatcher
+from utils.tracing import metrics
+from utils.youtube_utils import YouTubeURLParser
+
+
+class NotesServer:
+    """HTTP API that keeps one warm vector store and one set of service
+    clients for the lifetime of the process.
+
+    - POST /jobs {"url" | "video_id"} queues an ingest job (429 when full)
+    - GET /jobs and GET /jobs/{id} report job status
+    - POST /query {"query", "doc_id", "top_k"} answers from the index;
+      queries that arrive together share one embedding pass; top_k is
+      clamped to `max_top_k`
+    - GET /health and GET /metrics
+    """
+
+    def __init__(
+        self,
+        vector_store=None,
+        pipeline=None,
+        workers: int = SERVER_INGEST_WORKERS,
+        queue_size: int = SERVER_JOB_QUEUE_SIZE,
+        query_batch_size: int = SERVER_QUERY_BATCH_SIZE,
+        query_batch_wait_ms: float = SERVER_QUERY_BATCH_WAIT_MS,
+        query_timeout: float = SERVER_QUERY_TIMEOUT,
+        max_top_k: int = SERVER_MAX_TOP_K,
+    ):
+        self.vector_store = vector_store or self._default_vector_store()
+        self.pipeline = pipeline or self._default_pipeline(self.vector_store)
+        self.jobs = IngestJobQueue(self.pipeline, workers=workers, queue_size=queue_size)
+        self.query_timeout = query_timeout
+        self.max_top_k = max(1, max_top_k)
+        self.query_batcher = MicroBatcher(
+            self._answer_queries,
+            max_batch_size=query_batch_size,
+            max_wait=query_batch_wait_ms / 1000,
+            name="rag.query",
+        )
+        self.app = Starlette(
+            routes=[
+                Route("/health", self.health, methods=["GET"]),
+                Route("/metrics", self.prometheus_metrics, methods=["GET"]),
+                Route("/jobs", self.submit_job, methods=["POST"]),
+                Route("/jobs", self.list_jobs, methods=["GET"]),
+                Route("/jobs/{job_id}", self.get_job, methods=["GET"]),
+                Route("/query", self.query, methods=["POST"]),
+            ]
+        )
+
+    @staticmethod
+    def _default_vector_store():
+        from integrations.rag_implementation import MarkdownVectorStore
+
+        return MarkdownVectorStore(
+            qdrant_url=QDRANT_URL,
+            qdrant_api_key=QDRANT_API_KEY,
+            collection_name=COLLECTION_NAME,
+            warm_up_in_background=True,
+        )
+
+    @staticmethod
+    def _default_pipeline(vector_store):
+        from integrations.notion_mcp_client import NotionMCPClient
+        from integrations.notion_sync import NotionPageSync
+        from services.batch_pipeline import build_video_pipeline
+        from services.langchain_notes_service import LangChainNotesService
+        from services.transcript_service import TranscriptService
+
+        return build_video_pipeline(
+            transcript_service=TranscriptService(),
+            notes_service=LangChainNotesService(),
+            notion_client=NotionPageSync() if NOTION_PARENT_PAGE_ID else NotionMCPClient(),
+            vector_store=vector_store,
+        )
+
+    def _answer_queries(self, items: List[Tuple[str, Optional[str], int]]) -> List[Dict[str, Any]]:
+        results: List[Any] = [None] * len(items)
+        by_top_k: Dict[int, List[int]] = {}
+        for i, (_, _, top_k) in enumerate(items):
+            by_top_k.setdefault(top_k, []).append(i)
+        for top_k, rows in by_top_k.items():
+            answers = self.vector_store.query_many(
+                [items[i][0] for i in rows],
+                top_k=top_k,
+                doc_ids=[items[i][1] for i in rows],
+            )
+            for row, answer in zip(rows, answers):
+                results[row] = answer
+        return results
+
+    def close(self) -> None:
+        self.query_batcher.close()
+        self.jobs.close()
+
+    async def health(self, _request):
+        payload = {"status": "ok", "ready": self.vector_store.ready, "queue": self.jobs.stats()}
+        query_cache = getattr(self.vector_store, "query_cache", None)
+        if query_cache is not None:
+            payload["query_cache"] = query_cache.stats()
+        return JSONResponse(payload)
+
+    async def prometheus_metrics(self, _request):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    async def submit_job(self, request):
+        try:
+            body = await request.json()
+            video_id = body.get("video_id") or YouTubeURLParser.extract_video_id(body["url"])
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            return JSONResponse({"error": f"Expected a video url or video_id: {e}"}, status_code=400)
+        if not video_id:
+            return JSONResponse({"error": "No video id in URL"}, status_code=400)
+
+        try:
+            job = self.jobs.submit(video_id)
+        except JobQueueFullError as e:
+            return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "5"})
+        return JSONResponse(job.to_dict(), status_code=202)
+
+    async def list_jobs(self, _request):
+        return JSONResponse({"jobs": [job.to_dict() for job in self.jobs.jobs()], **self.jobs.stats()})
+
+    async def get_job(self, request):
+        job = self.jobs.get(request.path_params["job_id"])
+        if job is None:
+            return JSONResponse({"error": "Unknown job"}, status_code=404)
+        return JSONResponse(job.to_dict())
+
+    async def query(self, request):
+        try:
+            body = await request.json()
+            query_text = str(body["query"]).strip()
+            top_k = int(body.get("top_k", 4))
+        except (KeyError, TypeError, ValueError) as e:
+            return JSONResponse({"error": f"Invalid query: {e}"}, status_code=400)
+        if not query_text or top_k < 1:
+            return JSONResponse({"error": "query must be non-empty and top_k positive"}, status_code=400)
+        top_k = min(top_k, self.max_top_k)
+
+        future = self.query_batcher.submit((query_text, body.get("doc_id"), top_k))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.query_timeout)
+        except asyncio.TimeoutError:
+            return JSONResponse({"error": f"Query timed out after {self.query_timeout:g}s"}, status_code=504)
+        except Exception as e:
+            return JSONResponse({"error": f"Query failed: {e}"}, status_code=500)
+        return JSONResponse(result)
+
+    def serve(self, host: str, port: int) -> None:
+        import uvicorn
+
+        uvicorn.run(self.app, host=host, port=port)
@@ -0,0 +1,295 @@
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import (
+    APP_REFERER,
+    APP_TITLE,
+    OPENROUTER_API_KEY,
+    OPENROUTER_BREAKER_RESET,
+    OPENROUTER_BREAKER_THRESHOLD,
+    OPENROUTER_CONNECT_TIMEOUT,
+    OPENROUTER_MAX_RETRIES,
+    OPENROUTER_POOL_SIZE,
+    OPENROUTER_READ_TIMEOUT,
+    OPENROUTER_URL,
+)
+from utils.tracing import metrics as metrics_registry
+from utils.tracing import tracer
+
+
+class OpenRouterRateLimitError(RuntimeError):
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures and lets a single
+    trial request through once `reset_timeout` seconds have passed."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return
+            raise CircuitOpenError(
+                f"OpenRouter circuit is {self.state.replace('_', '-')} after "
+                f"{self.failures} consecutive failures"
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class OpenRouterClient:
+    """Pooled, retrying HTTP client shared by every OpenRouter caller.
+
+    429, 408 and 5xx responses as well as connection errors are retried with
+    jittered exponential backoff, waiting at least as long as Retry-After /
+    X-RateLimit-Reset ask for. Request latency and the `usage` block of each
+    response are recorded in `metrics`.
+    """
+
+    RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: Optional[str] = OPENROUTER_API_KEY,
+        url: str = OPENROUTER_URL,
+        connect_timeout: float = OPENROUTER_CONNECT_TIMEOUT,
+        read_timeout: float = OPENROUTER_READ_TIMEOUT,
+        max_retries: int = OPENROUTER_MAX_RETRIES,
+        pool_size: int = OPENROUTER_POOL_SIZE,
+        breaker: Optional[CircuitBreaker] = None,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ):
+        if not api_key:
+            raise RuntimeError("Set OPENROUTER_API_KEY in environment variables")
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker(
+            OPENROUTER_BREAKER_THRESHOLD, OPENROUTER_BREAKER_RESET
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": APP_REFERER,
+                "X-Title": APP_TITLE,
+            }
+        )
+
+        self._listeners: List[Callable[[Optional[float]], None]] = []
+        self._lock = threading.Lock()
+        self.metrics = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+        }
+        self._latencies = deque(maxlen=1000)
+
+    def add_rate_limit_listener(self, listener: Callable[[Optional[float]], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_rate_limit_listener(self, listener: Callable[[Optional[float]], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def chat(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with tracer.span("openrouter.chat", model=payload.get("model")) as span:
+            response = self._request(payload, stream=False)
+            result = response.json()
+            usage = result.get("usage") or {}
+            span.set(bytes=len(response.content), **usage)
+            self.record_usage(usage)
+            return result
+
+    def stream_chat(self, payload: Dict[str, Any]) -> requests.Response:
+        """Opens an SSE completion. Only the connection is retried: once the
+        200 response is returned, the caller owns (and must close) the stream
+        and should pass the final `usage` block to `record_usage`."""
+        with tracer.span("openrouter.stream_connect", model=payload.get("model")):
+            return self._request({**payload, "stream": True}, stream=True)
+
+    def record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        if not usage:
+            return
+        with self._lock:
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                self.metrics[key] += usage.get(key) or 0
+        for kind in ("prompt", "completion"):
+            metrics_registry.inc(
+                "openrouter_tokens_total", usage.get(f"{kind}_tokens") or 0, kind=kind
+            )
+
+    def _request(self, payload: Dict[str, Any], stream: bool) -> requests.Response:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            attempt += 1
+            start = time.perf_counter()
+            try:
+                response = self.session.post(
+                    self.url, json=payload, timeout=self.timeout, stream=stream
+                )
+            except requests.RequestException as e:
+                # Every failed attempt must reach the breaker, or a half-open
+                # trial that fails this way would leave it half-open for good.
+                self._record_attempt(time.perf_counter() - start, failed=True, status="error")
+                self.breaker.record_failure()
+                if attempt > self.max_retries:
+                    raise RuntimeError(f"OpenRouter request failed: {e}") from e
+                self._sleep(attempt, None)
+                continue
+
+            self._record_attempt(
+                time.perf_counter() - start,
+                failed=response.status_code != 200,
+                status=response.status_code,
+            )
+            if response.status_code == 200:
+                self.breaker.record_success()
+                return response
+
+            retry_after = self._retry_after(response)
+            if response.status_code == 429:
+                self._on_rate_limited(retry_after)
+            # Only timeouts and server errors count towards the breaker; a 429
+            # or a rejected request still means OpenRouter is up.
+            if response.status_code == 429 or response.status_code not in self.RETRY_STATUSES:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+            if response.status_code not in self.RETRY_STATUSES or attempt > self.max_retries:
+                if response.status_code == 429:
+                    raise OpenRouterRateLimitError(
+                        f"OpenRouter API error 429: {response.text}", retry_after=retry_after
+                    )
+                raise RuntimeError(
+                    f"OpenRouter API error {response.status_code}: {response.text}"
+                )
+            response.close()
+            self._sleep(attempt, retry_after)
+
+    def _sleep(self, attempt: int, retry_after: Optional[float]) -> None:
+        with self._lock:
+            self.metrics["retries"] += 1
+        metrics_registry.inc("openrouter_retries_total")
+        tracer.current().add("retries")
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        delay *= 0.5 + random.random()
+        time.sleep(max(delay, retry_after or 0.0))
+
+    def _record_attempt(self, latency: float, failed: bool, status) -> None:
+        with self._lock:
+            self.metrics["requests"] += 1
+            self.metrics["failures"] += int(failed)
+            self._latencies.append(latency)
+        metrics_registry.inc("openrouter_requests_total", status=status)
+        metrics_registry.observe("openrouter_request_seconds", latency)
+        span = tracer.current()
+        span.add("attempts")
+        span.set(status=status)
+
+    def _on_rate_limited(self, retry_after: Optional[float]) -> None:
+        with self._lock:
+            self.metrics["rate_limited"] += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(retry_after)
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        # OpenRouter reports the window reset as epoch milliseconds.
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset and reset.isdigit():
+            return max(0.0, int(reset) / 1000 - time.time())
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            metrics = dict(self.metrics)
+        if latencies:
+            metrics["latency_p50"] = latencies[len(latencies) // 2]
+            metrics["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        metrics["circuit"] = self.breaker.state
+        return metrics
+
+    def format_stats(self) -> str:
+        stats = self.stats()
+        line = (
+            f"OpenRouter: {stats['requests']} requests, {stats['retries']} retries, "
+            f"{stats['rate_limited']} rate-limited, {stats['failures']} failed, "
+            f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens"
+        )
+        if "latency_p50" in stats:
+            line += f", latency p50 {stats['latency_p50']:.2f}s p95 {stats['latency_p95']:.2f}s"
+        return line
+
+
+_default_client: Optional[OpenRouterClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> OpenRouterClient:
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OpenRouterClient()
+        return _default_client
@@ -0,0 +1,18 @@
+from typing import List
+
+
+class PlaylistService:
+    def get_video_ids(self, playlist_id: str) -> List[str]:
+        try:
+            from yt_dlp import YoutubeDL
+        except ImportError:
+            raise RuntimeError("Install yt-dlp to expand playlist URLs: pip install yt-dlp")
+
+        options = {"extract_flat": True, "quiet": True, "skip_download": True}
+        with YoutubeDL(options) as ydl:
+            info = ydl.extract_info(
+                f"https://www.youtube.com/playlist?list={playlist_id}",
+                download=False,
+            )
+
+        return [entry["id"] for entry in info.get("entries") or [] if entry.get("id")]
@@ -0,0 +1,141 @@
+import logging
+import math
+import re
+from functools import cached_property, lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from config.settings import NOTES_CONTEXT_TOKENS, NOTES_MAX_OUTPUT_TOKENS, NOTES_TOKENIZER
+from domain.prompt_builder import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _load_encoder(tokenizer_name: Optional[str]) -> Tuple[Optional[Callable[[str], int]], str]:
+    # Loaded on first count and shared by every TokenCounter in the process;
+    # from_pretrained may hit the network, so it never runs in a constructor.
+    if tokenizer_name:
+        try:
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_pretrained(tokenizer_name)
+            logger.info("Counting tokens with the %s tokenizer", tokenizer_name)
+            return (lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)), tokenizer_name
+        except Exception as e:
+            logger.warning("Could not load tokenizer %s (%s), falling back", tokenizer_name, e)
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        logger.info("Counting tokens with tiktoken cl100k_base")
+        return (lambda text: len(encoding.encode(text, disallowed_special=()))), "tiktoken:cl100k_base"
+    except Exception as e:
+        logger.warning("tiktoken unavailable (%s), estimating tokens from characters", e)
+    return None, "heuristic"
+
+
+class TokenCounter:
+    """Counts tokens with the model's own tokenizer when it can be loaded.
+
+    Falls back to tiktoken's cl100k_base and finally to a conservative
+    characters-per-token estimate; `source` says which one is in use. The
+    tokenizer is loaded on first use.
+    """
+
+    CHARS_PER_TOKEN = 3.5
+
+    def __init__(self, tokenizer_name: Optional[str] = NOTES_TOKENIZER):
+        self.tokenizer_name = tokenizer_name
+
+    @property
+    def source(self) -> str:
+        return _load_encoder(self.tokenizer_name)[1]
+
+    def count(self, text: str) -> int:
+        encode = _load_encoder(self.tokenizer_name)[0]
+        if encode is not None:
+            return encode(text)
+        return math.ceil(len(text) / self.CHARS_PER_TOKEN)
+
+
+class TranscriptPacker:
+    """Packs a transcript into as few prompts as fit the context budget.
+
+    Text is only cut at sentence ends or line breaks (one caption segment per
+    line); a single unit longer than the budget is cut between words.
+    """
+
+    # Sentence end followed by whitespace, or a line break.
+    _BOUNDARY = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+    def __init__(
+        self,
+        counter: Optional[TokenCounter] = None,
+        context_tokens: int = NOTES_CONTEXT_TOKENS,
+        max_output_tokens: int = NOTES_MAX_OUTPUT_TOKENS,
+        safety_margin: float = 0.03,
+    ):
+        self.counter = counter or TokenCounter()
+        self.context_tokens = context_tokens
+        self.max_output_tokens = max_output_tokens
+        self.safety_margin = safety_margin
+
+    @cached_property
+    def budget(self) -> int:
+        # Worked out on first use, which is when the tokenizer gets loaded.
+        prompt_overhead = self.counter.count(PromptBuilder.build(""))
+        # Units are counted one by one, and tokens can merge across the joins;
+        # the margin absorbs that difference.
+        available = self.context_tokens - self.max_output_tokens - prompt_overhead
+        budget = int(available * (1 - self.safety_margin))
+        if budget <= 0:
+            raise ValueError(
+                f"Context budget of {self.context_tokens} tokens leaves no room for the transcript "
+                f"({self.max_output_tokens} output + {prompt_overhead} prompt tokens)"
+            )
+        return budget
+
+    def _units(self, text: str) -> List[str]:
+        units = []
+        start = 0
+        for match in self._BOUNDARY.finditer(text):
+            units.append(text[start : match.end()])
+            start = match.end()
+        if start < len(text):
+            units.append(text[start:])
+        return units
+
+    def _split_long(self, unit: str) -> List[str]:
+        pieces, current, tokens = [], [], 0
+        for word in re.findall(r"\S+\s*", unit):
+            word_tokens = self.counter.count(word)
+            if current and tokens + word_tokens > self.budget:
+                pieces.append("".join(current))
+                current, tokens = [], 0
+            current.append(word)
+            tokens += word_tokens
+        if current:
+            pieces.append("".join(current))
+        return pieces
+
+    def pack(self, text: str) -> List[str]:
+        chunks, current, tokens = [], [], 0
+        for unit in self._units(text):
+            unit_tokens = self.counter.count(unit)
+            if unit_tokens > self.budget:
+                parts = self._split_long(unit)
+            else:
+                parts = [unit]
+            for part in parts:
+                part_tokens = unit_tokens if len(parts) == 1 else self.counter.count(part)
+                if current and tokens + part_tokens > self.budget:
+                    chunks.append("".join(current).strip())
+                    current, tokens = [], 0
+                current.append(part)
+                tokens += part_tokens
+        if current and "".join(current).strip():
+            chunks.append("".join(current).strip())
+        return chunks
+
+    def prompt_tokens(self, chunks: List[str]) -> int:
+        return sum(self.counter.count(PromptBuilder.build(chunk)) for chunk in chunks)
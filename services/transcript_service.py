@@ -1,15 +1,130 @@
 import json
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.formatters import JSONFormatter
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import TRANSCRIPT_CACHE_DIR, TRANSCRIPT_COMPACTION, TRANSCRIPT_MAX_WORKERS
+from domain.transcript_compactor import TranscriptCompactor
+from utils.tracing import tracer
+
+
+class TranscriptStore:
+    def __init__(self, root: str = TRANSCRIPT_CACHE_DIR):
+        self.root = root
+
+    def _path(self, video_id: str, language: str) -> str:
+        return os.path.join(self.root, video_id, f"{language}.json")
+
+    def load(self, video_id: str, languages: Iterable[str]) -> Optional[List[Dict]]:
+        for language in languages:
+            path = self._path(video_id, language)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)["segments"]
+        return None
+
+    def save(self, video_id: str, language: str, segments: List[Dict]) -> None:
+        path = self._path(video_id, language)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"video_id": video_id, "language": language, "segments": segments},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, path)
+
 
 class TranscriptService:
-    def get_transcript(self,video_id: str) -> str:
+    LANGUAGES = ['en', 'en-US', 'en-GB', 'hi', 'hi-IN']
+    # A long-running server would otherwise keep a report per video ever seen.
+    MAX_COMPACTION_REPORTS = 256
+
+    def __init__(
+        self,
+        store: Optional[TranscriptStore] = None,
+        use_cache: bool = True,
+        compact: bool = TRANSCRIPT_COMPACTION,
+    ):
+        from youtube_transcript_api import YouTubeTranscriptApi
+
+        self.api = YouTubeTranscriptApi()
+        self.store = (store or TranscriptStore()) if use_cache else None
+        self.compactor = TranscriptCompactor() if compact else None
+        # Compaction stats and timestamped sentences of the most recent
+        # videos, oldest first.
+        self.compaction_reports: Dict[str, Dict] = {}
+
+    def get_segments(self, video_id: str) -> List[Dict]:
+        if self.store is not None:
+            segments = self.store.load(video_id, self.LANGUAGES)
+            if segments is not None:
+                return segments
+
+        with tracer.span("youtube.fetch_transcript", video_id=video_id) as span:
+            transcript = self.api.fetch(video_id, languages=self.LANGUAGES)
+            segments = [
+                {"text": s.text, "start": s.start, "duration": s.duration}
+                for s in transcript.snippets
+            ]
+            span.set(segments=len(segments), language=transcript.language_code)
+
+        if self.store is not None:
+            self.store.save(video_id, transcript.language_code, segments)
+        return segments
+
+    def get_transcript(self, video_id: str) -> str:
+        with tracer.span("transcript.get", video_id=video_id) as span:
+            segments = self.get_segments(video_id)
+            span.set(segments=len(segments))
+            if self.compactor is None:
+                return "\n".join(s["text"] for s in segments)
+
+            sentences = self.compactor.compact(segments)
+            stats = self.compactor.stats(segments, sentences)
+            span.set(chars=stats["chars_after"], compaction_reduction=stats["reduction"])
+            reports = self.compaction_reports
+            reports.pop(video_id, None)
+            reports[video_id] = {**stats, "sentences_with_timestamps": sentences}
+            while len(reports) > self.MAX_COMPACTION_REPORTS:
+                reports.pop(next(iter(reports)), None)
+            return self.compactor.to_text(sentences)
+
+    def get_sentences(self, video_id: str) -> Optional[List[Dict]]:
+        """Compacted sentences with their `start`/`end` caption timestamps,
+        for videos fetched recently by this service."""
+        report = self.compaction_reports.get(video_id)
+        return report["sentences_with_timestamps"] if report is not None else None
+
+    def format_compaction(self, video_id: str) -> str:
+        report = self.compaction_reports.get(video_id)
+        if report is None:
+            return f"Transcript {video_id}: not compacted"
+        return (
+            f"Transcript {video_id}: {report['segments']} segments -> "
+            f"{report['sentences']} sentences, {report['chars_before']} -> "
+            f"{report['chars_after']} chars ({report['reduction']:.0%} smaller)"
+        )
 
-        api = YouTubeTranscriptApi()
-        transcript = api.fetch(video_id,
-        languages=['en', 'en-US', 'en-GB','hi','hi-IN'])
+    def get_transcripts(
+        self,
+        video_ids: List[str],
+        max_workers: int = TRANSCRIPT_MAX_WORKERS,
+    ) -> Dict[str, Dict[str, str]]:
+        transcripts: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+        unique_ids = list(dict.fromkeys(video_ids))
 
-        formatter = JSONFormatter()
-        json_data = json.loads(formatter.format_transcript(transcript))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {
+                video_id: pool.submit(self.get_transcript, video_id)
+                for video_id in unique_ids
+            }
+            for video_id, future in futures.items():
+                try:
+                    transcripts[video_id] = future.result()
+                except Exception as e:
+                    errors[video_id] = str(e)
 
-        return "\n".join(item["text"] for item in json_data)
+        return {"transcripts": transcripts, "errors": errors}
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from integrations.notion_mcp_client import NotionMCPClient
+from integrations.notion_mcp_server import NotionMCPServer
+
+
+class FakeNotion:
+    def __init__(self):
+        self.pages = {}
+
+    async def create_page(self, parent_page_id, title, properties=None, children=None):
+        page_id = f"page-{len(self.pages) + 1}"
+        self.pages[page_id] = []
+        return {"ok": True, "data": {"id": page_id}}
+
+    async def append_block_children(self, block_id, children, after=None):
+        if block_id not in self.pages:
+            return {"ok": False, "error": f"unknown page {block_id}"}
+        self.pages[block_id].extend(children)
+        return {"ok": True, "data": {"results": children}}
+
+
+class FakeAI:
+    def __init__(self, tool_calls):
+        self.tool_calls = tool_calls
+
+    def llm_with_tools(self, **kwargs):
+        calls = [
+            {"id": f"call_{i}", "function": {"name": name, "arguments": json.dumps(args)}}
+            for i, (name, args) in enumerate(self.tool_calls)
+        ]
+        return {"choices": [{"message": {"tool_calls": calls}}]}
+
+
+def run_agent(tool_calls):
+    # Skips the constructors, which need API keys and a running MCP server.
+    server = NotionMCPServer.__new__(NotionMCPServer)
+    server.notion = FakeNotion()
+    client = NotionMCPClient.__new__(NotionMCPClient)
+    client.ai = FakeAI(tool_calls)
+    client.list_tools = lambda: []
+    sent = []
+
+    def call_tools(calls):
+        sent.extend(calls)
+        return asyncio.run(server._run_batch(calls))
+
+    client.call_tools = call_tools
+    client._run("store the notes")
+    return server.notion.pages, sent
+
+
+def test_refs_by_call_number_chain_append_after_create():
+    pages, sent = run_agent([
+        ("create_page", {"parent_page_id": "parent", "title": "Notes"}),
+        ("append_block_children", {"block_id": {"$ref": "0.data.id"}, "children": [{"type": "paragraph"}]}),
+    ])
+    assert pages == {"page-1": [{"type": "paragraph"}]}
+    assert [call["id"] for call in sent] == ["0", "1"]
+
+
+def test_append_without_target_follows_the_create():
+    pages, sent = run_agent([
+        ("create_page", {"parent_page_id": "parent", "title": "Notes"}),
+        ("append_block_children", {"children": [{"type": "paragraph"}]}),
+        ("append_block_children", {"children": [{"type": "heading_2"}], "depends_on": ["1"]}),
+    ])
+    assert pages == {"page-1": [{"type": "paragraph"}, {"type": "heading_2"}]}
+    assert sent[2]["depends_on"] == ["1"]
+    assert "depends_on" not in sent[2]["arguments"]
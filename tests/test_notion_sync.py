@@ -0,0 +1,144 @@
+import asyncio
+import itertools
+
+import pytest
+
+from integrations.notion_sync import NotionPageSync
+
+
+class FakeNotion:
+    """In-memory stand-in for NotionClient: one page's children, in order."""
+
+    def __init__(self):
+        self.pages = {}
+        self.calls = []
+        self.fail_on = set()
+        self._ids = itertools.count(1)
+
+    def _response(self, action, data):
+        self.calls.append(action)
+        if action in self.fail_on:
+            return {"ok": False, "error": f"{action} unavailable"}
+        return {"ok": True, "data": data}
+
+    async def create_page(self, parent_page_id, title):
+        page_id = f"page-{next(self._ids)}"
+        response = self._response("create_page", {"id": page_id})
+        if response["ok"]:
+            self.pages[page_id] = []
+        return response
+
+    async def list_block_children(self, page_id):
+        return self._response("list_block_children", {"results": list(self.pages[page_id])})
+
+    async def append_block_children(self, page_id, children, after=None):
+        response = self._response("append_block_children", None)
+        if not response["ok"]:
+            return response
+        blocks = self.pages[page_id]
+        at = len(blocks) if after is None else [b["id"] for b in blocks].index(after) + 1
+        created = [{**child, "id": f"block-{next(self._ids)}"} for child in children]
+        blocks[at:at] = created
+        return {"ok": True, "data": {"results": blocks[at:]}}
+
+    async def update_block(self, block_id, block):
+        response = self._response("update_block", None)
+        if response["ok"]:
+            for blocks in self.pages.values():
+                for i, existing in enumerate(blocks):
+                    if existing["id"] == block_id:
+                        blocks[i] = {**block, "id": block_id}
+        return response
+
+    async def delete_block(self, block_id):
+        response = self._response("delete_block", None)
+        if response["ok"]:
+            for page_id, blocks in self.pages.items():
+                self.pages[page_id] = [b for b in blocks if b["id"] != block_id]
+        return response
+
+
+@pytest.fixture
+def notion():
+    return FakeNotion()
+
+
+@pytest.fixture
+def sync(notion, tmp_path):
+    return NotionPageSync(parent_page_id="parent", notion=notion, state_dir=str(tmp_path))
+
+
+def run(sync, markdown):
+    return asyncio.run(sync.sync("video", "Notes", markdown))
+
+
+def page_hashes(notion, page_id):
+    return [NotionPageSync.block_hash(block) for block in notion.pages[page_id]]
+
+
+def expected_hashes(sync, markdown):
+    return [sync.block_hash(block) for block in sync.converter.convert(markdown)]
+
+
+BASE = "# Title\n\nFirst paragraph.\n\nSecond paragraph.\n\nThird paragraph."
+
+
+def test_first_sync_creates_page(sync, notion):
+    report = run(sync, BASE)
+    assert report["created"] == 4
+    assert page_hashes(notion, report["page_id"]) == expected_hashes(sync, BASE)
+
+
+def test_unchanged_notes_make_no_requests(sync, notion):
+    run(sync, BASE)
+    notion.calls.clear()
+    report = run(sync, BASE)
+    assert report == {"page_id": report["page_id"], "skipped": 4, "updated": 0, "created": 0, "archived": 0}
+    assert notion.calls == []
+
+
+@pytest.mark.parametrize(
+    "markdown, changes",
+    [
+        # replace with the same block type -> update in place
+        (BASE.replace("Second", "Edited"), {"updated": 1}),
+        # delete -> archive
+        (BASE.replace("\n\nSecond paragraph.", ""), {"archived": 1}),
+        # insert in the middle -> append after the preceding block
+        (BASE.replace("Second paragraph.", "New paragraph.\n\nSecond paragraph."), {"created": 1}),
+        # replace with a different block type -> archive and insert
+        (BASE.replace("Second paragraph.", "## Second"), {"archived": 1, "created": 1}),
+        # insert at the top -> full rewrite
+        ("Intro.\n\n" + BASE, {"archived": 4, "created": 5}),
+    ],
+)
+def test_opcodes_map_to_minimal_block_changes(sync, notion, markdown, changes):
+    page_id = run(sync, BASE)["page_id"]
+    report = run(sync, markdown)
+    for field in ("updated", "archived", "created"):
+        assert report[field] == changes.get(field, 0), field
+    assert page_hashes(notion, page_id) == expected_hashes(sync, markdown)
+
+
+def test_failed_first_sync_reuses_the_created_page(sync, notion):
+    notion.fail_on = {"append_block_children"}
+    with pytest.raises(RuntimeError):
+        run(sync, BASE)
+    notion.fail_on = set()
+    report = run(sync, BASE)
+    assert notion.calls.count("create_page") == 1
+    assert page_hashes(notion, report["page_id"]) == expected_hashes(sync, BASE)
+
+
+def test_failed_sync_reads_the_page_back(sync, notion):
+    page_id = run(sync, BASE)["page_id"]
+    edited = BASE.replace("Second", "Edited").replace("Third paragraph.", "Third paragraph.\n\nFourth.")
+    notion.fail_on = {"append_block_children"}
+    with pytest.raises(RuntimeError):
+        run(sync, edited)
+    notion.fail_on = set()
+    notion.calls.clear()
+    report = run(sync, edited)
+    assert notion.calls[0] == "list_block_children"
+    assert report["updated"] == 0 and report["created"] == 1
+    assert page_hashes(notion, page_id) == expected_hashes(sync, edited)
@@ -0,0 +1,69 @@
+import pytest
+import requests
+
+from services.openrouter_client import CircuitBreaker, CircuitOpenError, OpenRouterClient
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    text = ""
+    content = b"{}"
+
+    def json(self):
+        return {"choices": [{"message": {"content": "ok"}}]}
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def post(self, *args, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_client(outcomes, max_retries=0):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    client = OpenRouterClient(api_key="test", max_retries=max_retries, breaker=breaker, backoff_base=0)
+    client.session = FakeSession(outcomes)
+    return client
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.exceptions.ChunkedEncodingError(), requests.TooManyRedirects(), requests.exceptions.ContentDecodingError()],
+)
+def test_failed_half_open_trial_reopens_the_breaker(error):
+    client = make_client([requests.ConnectionError(), error, FakeResponse()])
+    with pytest.raises(RuntimeError):
+        client.chat({})
+    assert client.breaker.state == "open"
+    # The half-open trial fails with a non-connection error...
+    with pytest.raises(RuntimeError):
+        client.chat({})
+    assert client.breaker.state == "open"
+    # ...and the next trial after reset_timeout can still close the breaker.
+    assert client.chat({})["choices"][0]["message"]["content"] == "ok"
+    assert client.breaker.state == "closed"
+
+
+def test_request_errors_are_retried():
+    client = make_client([requests.exceptions.ChunkedEncodingError(), FakeResponse()], max_retries=1)
+    client.breaker.failure_threshold = 5
+    assert client.chat({})["choices"][0]["message"]["content"] == "ok"
+    assert client.metrics["retries"] == 1
+
+
+def test_open_breaker_rejects_calls():
+    client = make_client([requests.ConnectionError()])
+    client.breaker.reset_timeout = 60
+    with pytest.raises(RuntimeError):
+        client.chat({})
+    with pytest.raises(CircuitOpenError):
+        client.chat({})
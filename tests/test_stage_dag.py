@@ -0,0 +1,75 @@
+import pytest
+
+from services.ingest_dag import build_ingest_dag
+from utils.stage_dag import StageDAG
+
+
+class Recorder:
+    def __init__(self):
+        self.captions = None
+        self.published = None
+
+    def write_captions(self, transcript):
+        self.captions = transcript
+
+    def publish(self, notes):
+        self.published = notes
+
+
+def start_ingest(fetch_transcript, stream_notes=None, recorder=None):
+    recorder = recorder or Recorder()
+    dag = build_ingest_dag(
+        fetch_transcript,
+        stream_notes or (lambda transcript: iter(transcript.split("|"))),
+        lambda sections: list(sections),
+        recorder.write_captions,
+        recorder.publish,
+    )
+    return dag.start()
+
+
+def test_sections_reach_the_indexer_and_notion():
+    recorder = Recorder()
+    dag = start_ingest(lambda: "intro|body|summary", recorder=recorder)
+    assert dag.result("index", timeout=5) == ["intro", "body", "summary"]
+    assert dag.wait() == {}
+    assert recorder.captions == "intro|body|summary"
+    assert recorder.published == "intro\n\nbody\n\nsummary"
+
+
+def test_failed_transcript_fails_dependents_without_hanging():
+    def fetch_transcript():
+        raise RuntimeError("no captions")
+
+    dag = start_ingest(fetch_transcript)
+    with pytest.raises(RuntimeError, match="no captions"):
+        dag.result("index", timeout=5)
+    assert set(dag.wait()) == {"transcript", "notes", "write_files", "notion", "index"}
+    assert "index" not in dag.timings
+
+
+def test_failed_notes_stream_aborts_indexing():
+    def stream_notes(transcript):
+        yield "intro"
+        raise RuntimeError("LLM down")
+
+    dag = start_ingest(lambda: "intro|body", stream_notes)
+    with pytest.raises(RuntimeError, match="Note generation failed"):
+        dag.result("index", timeout=5)
+    errors = dag.wait()
+    assert set(errors) == {"notes", "notion", "index"}
+    assert str(errors["index"].__cause__) == "LLM down"
+
+
+def test_dependency_results_are_passed_by_stage_name():
+    dag = StageDAG()
+    dag.add("a", lambda: 2)
+    dag.add("b", lambda: 3)
+    dag.add("c", lambda a, b: a * b, depends_on=["a", "b"])
+    assert dag.start().result("c", timeout=5) == 6
+
+
+def test_unknown_dependency_is_rejected():
+    dag = StageDAG()
+    with pytest.raises(ValueError):
+        dag.add("notes", lambda transcript: transcript, depends_on=["transcript"])
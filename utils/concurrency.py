@@ -0,0 +1,48 @@
+import threading
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limiter: grows by one slot after a run of successes, halves on rate limits."""
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, increase_after: int = 5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.increase_after = increase_after
+        self.limit = self.max_concurrency
+        self.in_flight = 0
+        self.rate_limited = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.increase_after and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self) -> None:
+        with self._cond:
+            self.rate_limited += 1
+            self._successes = 0
+            self.limit = max(self.min_concurrency, self.limit // 2)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
@@ -5,4 +5,11 @@ class FileWriter:
     def write(filepath: str, content: str)-> None:
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
         with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
\ No newline at end of file
+            f.write(content)
+
+    @staticmethod
+    def append(filepath: str, content: str) -> None:
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, "a", encoding="utf-8") as f:
+            f.write(content)
+            f.flush()
@@ -0,0 +1,87 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+from utils.tracing import metrics
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Merges items submitted concurrently into batches for one handler call.
+
+    The first item of a batch waits at most `max_wait` seconds for others to
+    join; a batch is flushed early once it holds `max_batch_size` items.
+    `handler` receives the list of items and returns one result per item.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        name: str = "batcher",
+    ):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue[Tuple[Any, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _collect(self, first) -> Tuple[List, bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            # Futures cancelled while queued (e.g. a timed-out request) are
+            # skipped; the rest can no longer be cancelled once running.
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                if stop:
+                    return
+                continue
+            items = [item for item, _ in batch]
+            metrics.inc("batcher_batches_total", batcher=self.name)
+            metrics.inc("batcher_items_total", len(items), batcher=self.name)
+            try:
+                results = self.handler(items)
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"{self.name} handler returned {len(results)} results for {len(batch)} items"
+                    )
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            if stop:
+                return
@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.tracing import propagate, tracer
+
+
+class StageDAG:
+    """Runs named stages on a thread pool as soon as their dependencies finish.
+
+    A stage function receives its dependencies' results as keyword arguments
+    named after those stages. If a dependency fails, the stage fails with the
+    same exception without running. Background stages, which the caller does
+    not wait for before moving on, trace as their own root spans.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.timings: Dict[str, float] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        depends_on: Iterable[str] = (),
+        background: bool = False,
+    ) -> None:
+        if name in self._stages:
+            raise ValueError(f"Stage already defined: {name}")
+        depends_on = list(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+        self._stages[name] = {"fn": fn, "depends_on": depends_on, "background": background}
+
+    def start(self) -> "StageDAG":
+        # Stages are submitted in declaration order, which is topological since
+        # dependencies must be declared first; one thread per stage means a
+        # stage waiting on its dependencies can never starve them.
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self._stages)))
+        for name, stage in self._stages.items():
+            self._futures[name] = self._executor.submit(propagate(self._run_stage), name, stage)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def _run_stage(self, name: str, stage: Dict[str, Any]) -> Any:
+        kwargs = {
+            dependency: self._futures[dependency].result()
+            for dependency in stage["depends_on"]
+        }
+        start = time.perf_counter()
+        try:
+            with tracer.span(f"stage.{name}") as span:
+                if stage["background"]:
+                    span.detach()
+                return stage["fn"](**kwargs)
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        return self._futures[name].result(timeout=timeout)
+
+    def wait(self) -> Dict[str, BaseException]:
+        errors = {}
+        for name, future in self._futures.items():
+            error = future.exception()
+            if error is not None:
+                errors[name] = error
+        return errors
+
+    def format_timings(self) -> str:
+        lines: List[str] = []
+        for name in self._stages:
+            if name in self.timings:
+                lines.append(f"  {name:<12} {self.timings[name]:.2f}s")
+        return "\n".join(lines)
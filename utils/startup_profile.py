@@ -0,0 +1,48 @@
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+class StartupProfiler:
+    """Per-module import cost of a module, as reported by ``python -X importtime``."""
+
+    @staticmethod
+    def measure(module: str = "main") -> List[Tuple[str, int, int]]:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+        )
+        rows = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        return rows
+
+    @staticmethod
+    def by_package(rows: List[Tuple[str, int, int]]) -> Dict[str, int]:
+        totals: Dict[str, int] = defaultdict(int)
+        for name, self_us, _ in rows:
+            totals[name.split(".")[0]] += self_us
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    @classmethod
+    def report(cls, module: str = "main", top: int = 15) -> str:
+        rows = cls.measure(module)
+        total_us = sum(self_us for _, self_us, _ in rows)
+        lines = [f"import {module}: {total_us / 1000:.1f} ms across {len(rows)} modules", ""]
+
+        lines.append(f"{'package':<32} {'self ms':>9}")
+        for package, self_us in list(cls.by_package(rows).items())[:top]:
+            lines.append(f"{package:<32} {self_us / 1000:>9.1f}")
+
+        lines.append("")
+        lines.append(f"{'module':<48} {'cumulative ms':>14}")
+        for name, _, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:top]:
+            lines.append(f"{name:<48} {cumulative_us / 1000:>14.1f}")
+        return "\n".join(lines)
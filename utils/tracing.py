@@ -0,0 +1,289 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import TRACE_DIR, TRACE_MAX_SPANS, TRACING_ENABLED
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    __slots__ = ("tracer", "name", "span_id", "parent_id", "attributes", "start", "end", "thread", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id: Optional[str] = None
+        self.attributes = attributes
+        self.start = 0.0
+        self.end = 0.0
+        self.thread = ""
+        self._token = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, value: float = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def detach(self) -> None:
+        """Turns an open span into a root span for work that outlives its
+        parent; the parent is kept as `follows_from`."""
+        if self.parent_id is not None:
+            self.attributes["follows_from"] = self.parent_id
+            self.parent_id = None
+
+    def _open(self) -> None:
+        parent = _current_span.get()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+
+    def _close(self, exc_type, exc) -> None:
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self.tracer._finish(self)
+
+    def __enter__(self) -> "Span":
+        self._open()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # A span opened in a generator that is closed from another context.
+            pass
+        self._close(exc_type, exc)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class _NoopSpan:
+    """Returned for every span while tracing is off, so hot paths pay only
+    an attribute check and a method call."""
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def add(self, key: str, value: float = 1) -> None:
+        pass
+
+    def detach(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects nested spans for one run and exports them as a JSON trace.
+
+    At most `max_spans` finished spans are kept; older ones are dropped.
+    """
+
+    def __init__(self, enabled: bool = TRACING_ENABLED, max_spans: int = TRACE_MAX_SPANS):
+        self.enabled = enabled
+        self.trace_id = uuid.uuid4().hex
+        self.spans: "deque[Span]" = deque(maxlen=max(1, max_spans))
+        self.dropped_spans = 0
+        self._origin = time.perf_counter()
+        self._wall_origin = time.time()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def current(self):
+        return (_current_span.get() if self.enabled else None) or _NOOP_SPAN
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            if len(self.spans) == self.spans.maxlen:
+                self.dropped_spans += 1
+            self.spans.append(span)
+        metrics.observe("span_duration_seconds", span.duration, span=span.name)
+
+    def export(self, path: Optional[str] = None) -> Optional[str]:
+        if not self.enabled:
+            return None
+        path = path or os.path.join(TRACE_DIR, f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{self.trace_id[:8]}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+            dropped = self.dropped_spans
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "trace_id": self.trace_id,
+                    "started_at": self._wall_origin,
+                    "dropped_spans": dropped,
+                    "spans": [
+                        {
+                            "name": span.name,
+                            "span_id": span.span_id,
+                            "parent_id": span.parent_id,
+                            "start": span.start - self._origin,
+                            "duration": span.duration,
+                            "thread": span.thread,
+                            "attributes": span.attributes,
+                        }
+                        for span in spans
+                    ],
+                },
+                f,
+                indent=2,
+                default=str,
+            )
+        return path
+
+
+def traced(name: str) -> Callable:
+    """Decorator that runs the function inside a span; the body can attach
+    attributes through ``tracer.current()``."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_iter(name: str, iterator: Iterator, **attributes) -> Iterator:
+    """Yields from `iterator` inside a span that is current only while the
+    next item is being produced.
+
+    A ``with tracer.span(...)`` around ``yield`` would leave the span current
+    in the consumer's context between items, so spans the consumer opens
+    would nest under it.
+    """
+    if not tracer.enabled:
+        yield from iterator
+        return
+    span = tracer.span(name, **attributes)
+    span._open()
+    error = None
+    try:
+        while True:
+            token = _current_span.set(span)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current_span.reset(token)
+            yield item
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        span._close(type(error) if error is not None else None, error)
+
+
+def propagate(fn: Callable) -> Callable:
+    """Wraps `fn` so spans it opens on a worker thread nest under the
+    caller's current span."""
+    if not tracer.enabled:
+        return fn
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+
+class MetricsRegistry:
+    """Counters and histograms rendered in the Prometheus text format."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[Tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: Dict[str, Dict[Tuple, List[float]]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[name][self._labels(labels)] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            # Per-bucket counts followed by sum and count.
+            series = self._histograms[name].setdefault(key, [0.0] * (len(self.BUCKETS) + 2))
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @staticmethod
+    def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+        pairs = labels + extra
+        if not pairs:
+            return ""
+        escaped = (
+            (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in pairs
+        )
+        return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in series.items():
+                    lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, values in series.items():
+                    for bound, count in zip(self.BUCKETS, values):
+                        lines.append(
+                            f"{name}_bucket{self._format_labels(labels, (('le', f'{bound:g}'),))} {count:g}"
+                        )
+                    lines.append(
+                        f"{name}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {values[-1]:g}"
+                    )
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {values[-2]:g}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {values[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+
+tracer = Tracer()
+metrics = MetricsRegistry()
@@ -1,3 +1,4 @@
+from typing import Optional
 from urllib.parse import urlparse, parse_qs 
 
 class YouTubeURLParser:
@@ -11,4 +12,13 @@ class YouTubeURLParser:
         if parsed.hostname == "youtu.be":
             return parsed.path[1:]
         
-        raise ValueError("Invalid YouTube URL")
\ No newline at end of file
+        raise ValueError("Invalid YouTube URL")
+
+    @staticmethod
+    def extract_playlist_id(url: str) -> Optional[str]:
+        parsed = urlparse(url)
+
+        if parsed.hostname in ("www.youtube.com", "youtube.com", "youtu.be"):
+            return parse_qs(parsed.query).get("list", [None])[0]
+
+        raise ValueError("Invalid YouTube URL")